@@ -28,7 +28,7 @@ setup_logging(log_level="INFO", log_dir="logs")
 logger = get_logger("main")
 log_system_info()
 
-from fastapi import FastAPI, HTTPException, Body
+from fastapi import FastAPI, HTTPException, Body, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Dict, Any
@@ -76,6 +76,14 @@ async def lifespan(app: FastAPI):
             logger.error(f"Error closing vector service: {str(e)}")
     logger.info("Application shutdown completed")
 
+def get_vector_service() -> PostgreSQLVectorService:
+    """Dependency returning the vector service created at startup"""
+    return vector_service
+
+def get_rag_service() -> RAGService:
+    """Dependency returning the RAG service created at startup"""
+    return rag_service
+
 app = FastAPI(
     title="Regulatory Compliance RAG API",
     description="API for checking regulatory compliance using RAG with Instructions.pdf and Rules.pdf",
@@ -105,7 +113,7 @@ async def health_check():
     return {"status": "healthy", "vector_db": status}
 
 @app.post("/api/v1/compliance/check", response_model=ComplianceResponse)
-async def check_compliance(query: ComplianceQuery):
+async def check_compliance(query: ComplianceQuery, rag_service: RAGService = Depends(get_rag_service)):
     """
     Check regulatory compliance for provided data concerns against Instructions.pdf and Rules.pdf
     """
@@ -119,7 +127,7 @@ async def check_compliance(query: ComplianceQuery):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/v1/documents/status")
-async def get_document_status():
+async def get_document_status(vector_service: PostgreSQLVectorService = Depends(get_vector_service)):
     """
     Get the status of loaded documents in the vector database
     """
@@ -133,7 +141,7 @@ async def get_document_status():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/v1/documents/reload")
-async def reload_documents():
+async def reload_documents(vector_service: PostgreSQLVectorService = Depends(get_vector_service)):
     """
     Reload documents into the vector database
     """
@@ -147,7 +155,11 @@ async def reload_documents():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/v1/debug/top-chunks")
-async def debug_top_chunks(query: str = Body(...), n_results: int = Body(10)):
+async def debug_top_chunks(
+    query: str = Body(...),
+    n_results: int = Body(10),
+    vector_service: PostgreSQLVectorService = Depends(get_vector_service),
+):
     """Debug endpoint to return the top N chunks for a query, including content and metadata."""
     return await vector_service.debug_top_chunks(query, n_results)
 
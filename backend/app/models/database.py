@@ -1,14 +1,18 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float, Index, text
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Float, Index, Computed, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import ARRAY, BIT
 from pgvector.sqlalchemy import Vector
 from datetime import datetime
 import os
+import re
 from typing import List
 
 Base = declarative_base()
 
+# binary_quantize, bit(n) hamming HNSW indexes and halfvec all need pgvector 0.7.0 or later
+MIN_PGVECTOR_VERSION = (0, 7, 0)
+
 class DocumentChunk(Base):
     """Database model for document chunks with vector embeddings"""
     __tablename__ = "document_chunks"
@@ -21,6 +25,8 @@ class DocumentChunk(Base):
     page_number = Column(Integer, nullable=True)
     file_hash = Column(String(64), index=True, nullable=False)
     embedding = Column(Vector(1536), nullable=False)  # OpenAI embedding dimension
+    # Binary-quantized copy of the embedding (32x smaller) for coarse candidate search
+    embedding_binary = Column(BIT(1536), Computed("binary_quantize(embedding)::bit(1536)", persisted=True))
     chunk_metadata = Column(Text, nullable=True)  # JSON string
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -30,6 +36,15 @@ Index('idx_document_chunks_document_name', DocumentChunk.document_name)
 Index('idx_document_chunks_chunk_type', DocumentChunk.chunk_type)
 Index('idx_document_chunks_file_hash', DocumentChunk.file_hash)
 
+# HNSW index over the binary-quantized embeddings (hamming distance); searches only
+# re-rank these candidates by full precision, so the full embedding needs no ANN index
+Index(
+    'idx_document_chunks_embedding_binary_hnsw',
+    DocumentChunk.embedding_binary,
+    postgresql_using='hnsw',
+    postgresql_ops={'embedding_binary': 'bit_hamming_ops'}
+)
+
 def get_database_url():
     """Get database URL from environment variables"""
     host = os.getenv("POSTGRES_HOST", "localhost")
@@ -57,15 +72,39 @@ def create_session_factory():
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     return SessionLocal, engine
 
+def check_pgvector_version(conn):
+    """Fail with a clear error if the installed pgvector extension predates MIN_PGVECTOR_VERSION"""
+    installed = conn.execute(text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")).scalar()
+    version = tuple(int(part) for part in re.findall(r"\d+", installed or "")[:3])
+    if version < MIN_PGVECTOR_VERSION:
+        required = ".".join(str(part) for part in MIN_PGVECTOR_VERSION)
+        raise RuntimeError(
+            f"pgvector {installed or 'is not installed'}: version {required} or later is required "
+            f"(binary_quantize, bit_hamming_ops, halfvec). Upgrade the server package, then run "
+            f"ALTER EXTENSION vector UPDATE"
+        )
+
+def create_schema(conn):
+    """Create pgvector extension, tables and indexes on an open connection"""
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+    check_pgvector_version(conn)
+    Base.metadata.create_all(bind=conn, checkfirst=True)
+    
+    # Tables created before the binary column existed need it (and its indexes) added explicitly
+    conn.execute(text(
+        "ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS embedding_binary bit(1536) "
+        "GENERATED ALWAYS AS (binary_quantize(embedding)::bit(1536)) STORED"
+    ))
+    for index in DocumentChunk.__table__.indexes:
+        index.create(bind=conn, checkfirst=True)
+    # Cosine HNSW index from earlier schemas: never used by the re-rank, only slows inserts
+    conn.execute(text("DROP INDEX IF EXISTS idx_document_chunks_embedding_hnsw"))
+
 def init_database():
     """Initialize database tables and pgvector extension"""
     engine = create_database_engine()
     
-    # Enable pgvector extension
-    with engine.connect() as conn:
-        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
-        conn.commit()
-    
-    # Create tables
-    Base.metadata.create_all(bind=engine)
-    return engine 
\ No newline at end of file
+    # Enable pgvector extension and create tables/indexes in one transaction
+    with engine.begin() as conn:
+        create_schema(conn)
+    return engine
\ No newline at end of file
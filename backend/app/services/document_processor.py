@@ -5,6 +5,7 @@ from datetime import datetime
 import logging
 import hashlib
 import re
+from functools import lru_cache
 
 import PyPDF2
 from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -15,6 +16,17 @@ from ..utils.logging_config import get_logger
 
 logger = get_logger("document_processor")
 
+# Patterns compiled once at import time and shared by all processors
+_WHITESPACE_RE = re.compile(r'\s+')
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s\.,;:!?()-]')
+_PAGE_MARKER_RE = re.compile(r'\[PAGE (\d+)\]')
+_PAGE_MARKER_STRIP_RE = re.compile(r'\[PAGE \d+\]\n?')
+
+@lru_cache(maxsize=None)
+def _get_tokenizer(encoding_name: str = "cl100k_base"):
+    """Load a tiktoken encoding once per process"""
+    return tiktoken.get_encoding(encoding_name)
+
 class DocumentChunk:
     def __init__(self, content: str, metadata: Dict[str, Any]):
         self.content = content
@@ -48,7 +60,7 @@ class DocumentProcessor:
         )
         
         # Initialize tokenizer for accurate token counting
-        self.tokenizer = tiktoken.get_encoding("cl100k_base")
+        self.tokenizer = _get_tokenizer("cl100k_base")
     
     def _tiktoken_length(self, text: str) -> int:
         """Get accurate token count using tiktoken"""
@@ -58,11 +70,15 @@ class DocumentProcessor:
         """
         Process a PDF file and return semantic chunks
         """
+        return self._process_file(file_path)
+    
+    def _process_file(self, file_path: str) -> List[DocumentChunk]:
+        """Extract, clean and chunk a PDF file (synchronous core of process_pdf)"""
         try:
             logger.info(f"Processing PDF: {file_path}")
             
             # Extract text from PDF
-            text_content = await self._extract_pdf_text(file_path)
+            text_content = self._extract_pdf_text(file_path)
             
             # Clean and preprocess text
             cleaned_text = self._clean_text(text_content)
@@ -87,7 +103,7 @@ class DocumentProcessor:
             logger.error(f"Error processing PDF {file_path}: {str(e)}")
             raise
     
-    async def _extract_pdf_text(self, file_path: str) -> Dict[int, str]:
+    def _extract_pdf_text(self, file_path: str) -> Dict[int, str]:
         """Extract text from PDF with page information"""
         text_by_page = {}
         
@@ -111,8 +127,8 @@ class DocumentProcessor:
         
         for page_num, text in text_by_page.items():
             # Basic cleaning
-            text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-            text = re.sub(r'[^\w\s\.,;:!?()-]', '', text)  # Remove special chars
+            text = _WHITESPACE_RE.sub(' ', text)  # Normalize whitespace
+            text = _SPECIAL_CHARS_RE.sub('', text)  # Remove special chars
             text = text.strip()
             
             if text:
@@ -130,11 +146,11 @@ class DocumentProcessor:
         
         for i, chunk in enumerate(text_chunks):
             # Extract page number from content if available
-            page_match = re.search(r'\[PAGE (\d+)\]', chunk.page_content)
+            page_match = _PAGE_MARKER_RE.search(chunk.page_content)
             page_number = int(page_match.group(1)) if page_match else 1
             
             # Clean chunk content (remove page markers)
-            content = re.sub(r'\[PAGE \d+\]\n?', '', chunk.page_content).strip()
+            content = _PAGE_MARKER_STRIP_RE.sub('', chunk.page_content).strip()
             
             # Skip very short chunks
             if len(content) < 50:
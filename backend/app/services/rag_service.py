@@ -62,11 +62,11 @@ compliance_function = {
 }
 
 class RAGService:
-    def __init__(self, vector_service: PostgreSQLVectorService):
+    def __init__(self, vector_service: PostgreSQLVectorService, openai_client: Optional[AsyncOpenAI] = None):
         self.vector_service = vector_service
         
-        # Initialize OpenAI client
-        self.openai_client = AsyncOpenAI(
+        # Initialize OpenAI client (injectable, e.g. for testing)
+        self.openai_client = openai_client or AsyncOpenAI(
             api_key=os.getenv("OPENAI_API_KEY")
         )
         
@@ -4,7 +4,6 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime
 import logging
 import json
-import hashlib
 from sqlalchemy.orm import Session
 from sqlalchemy import text, bindparam
 import numpy as np
@@ -15,14 +14,24 @@ from .document_processor import DocumentProcessor, DocumentChunk
 from ..models.schemas import DocumentStatus, DocumentsStatus
 from ..models.database import create_session_factory, DocumentChunk as DBDocumentChunk, init_database
 from ..utils.logging_config import get_logger
+from ..utils.file_hash_cache import compute_file_hash
 
 logger = get_logger("vector_service")
 
+# Upper bound pgvector accepts for hnsw.ef_search
+MAX_HNSW_EF_SEARCH = 1000
+
+# Transaction-local ef_search, so the HNSW scan can return the whole candidate pool
+_SET_EF_SEARCH = text("SELECT set_config('hnsw.ef_search', :ef_search, true)")
+
 class PostgreSQLVectorService:
     def __init__(self, 
-                 embedding_model: str = "text-embedding-3-small"):
+                 embedding_model: str = "text-embedding-3-small",
+                 rerank_candidates: int = 1000):
         
         self.embedding_model = embedding_model
+        # Number of binary-quantized (hamming) candidates re-ranked by full-precision similarity
+        self.rerank_candidates = rerank_candidates
         
         # Initialize database
         self.SessionLocal, self.engine = create_session_factory()
@@ -41,12 +50,8 @@ class PostgreSQLVectorService:
         self.document_status = {}
     
     def _get_file_hash(self, file_path: str) -> str:
-        """Compute MD5 hash of a file for change detection"""
-        hash_md5 = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+        """Compute SHA-256 hash of a file for change detection"""
+        return compute_file_hash(file_path)
     
     async def initialize_database(self):
         """Initialize PostgreSQL database with pgvector extension"""
@@ -109,11 +114,20 @@ class PostgreSQLVectorService:
     async def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings using OpenAI API"""
         try:
-            response = self.openai_client.embeddings.create(
+            # Run the blocking client call off the event loop
+            response = await asyncio.to_thread(
+                self.openai_client.embeddings.create,
                 model=self.embedding_model,
                 input=texts
             )
-            return [embedding.embedding for embedding in response.data]
+            if not response.data:
+                return []
+            vectors = np.asarray([embedding.embedding for embedding in response.data], dtype=np.float32)
+            
+            # Unit-normalize once so search can rank by inner product instead of cosine
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.maximum(norms, 1e-12)
+            return vectors.tolist()
         except Exception as e:
             logger.error(f"Error generating OpenAI embeddings: {str(e)}")
             raise
@@ -122,8 +136,19 @@ class PostgreSQLVectorService:
         """Add documents to the PostgreSQL vector database"""
         try:
             results = {"processed": [], "failed": []}
+            # Documents are stored by file name, so a second file with the same name
+            # would replace the first one's chunks; only the first is loaded
+            seen_names = {}
             
             for file_path in file_paths:
+                document_name = os.path.basename(file_path)
+                if document_name in seen_names:
+                    error = f"Duplicate document name {document_name} (already loading {seen_names[document_name]})"
+                    logger.error(f"Error processing {file_path}: {error}")
+                    results["failed"].append({"file": file_path, "error": error})
+                    continue
+                seen_names[document_name] = file_path
+                
                 try:
                     # Compute hash if not provided
                     hash_to_use = file_hash or self._get_file_hash(file_path)
@@ -147,8 +172,12 @@ class PostgreSQLVectorService:
                     texts = [chunk.content for chunk in chunks]
                     embeddings = await self._generate_embeddings(texts)
                     
-                    # Store chunks and embeddings in database
+                    # Store chunks and embeddings in database, replacing any
+                    # previously stored version of the document
                     with self.SessionLocal() as db:
+                        db.query(DBDocumentChunk).filter(
+                            DBDocumentChunk.document_name == os.path.basename(file_path)
+                        ).delete()
                         for i, chunk in enumerate(chunks):
                             db_chunk = DBDocumentChunk(
                                 chunk_id=chunk.chunk_id,
@@ -208,16 +237,17 @@ class PostgreSQLVectorService:
             # Pass query_vector as a plain list; use CAST in SQL
             
             with self.SessionLocal() as db:
-                # Build the similarity search query using named parameters and CAST
-                sql_query = """
-                SELECT 
-                    content,
-                    chunk_metadata,
-                    chunk_type,
-                    document_name,
-                    page_number,
-                    1 - (embedding <=> CAST(:query_vector AS vector)) as similarity_score
-                FROM document_chunks
+                # Coarse candidate fetch on the binary-quantized column (hamming distance),
+                # then re-rank the candidates by inner product (cosine, as embeddings are unit-normalized)
+                candidate_query = """
+                    SELECT 
+                        content,
+                        chunk_metadata,
+                        chunk_type,
+                        document_name,
+                        page_number,
+                        embedding
+                    FROM document_chunks
                 """
                 params = {"query_vector": query_vector}
                 conditions = []
@@ -236,11 +266,30 @@ class PostgreSQLVectorService:
                             params["file_hash"] = value
                 
                 if conditions:
-                    sql_query += " WHERE " + " AND ".join(conditions)
+                    candidate_query += " WHERE " + " AND ".join(conditions)
                 
-                sql_query += " ORDER BY embedding <=> CAST(:query_vector AS vector) LIMIT :n_results"
+                candidate_query += """
+                    ORDER BY embedding_binary <~> binary_quantize(CAST(:query_vector AS vector))::bit(1536)
+                    LIMIT :n_candidates
+                """
+                params["n_candidates"] = max(self.rerank_candidates, n_results)
+                
+                sql_query = f"""
+                SELECT 
+                    content,
+                    chunk_metadata,
+                    chunk_type,
+                    document_name,
+                    page_number,
+                    -(embedding <#> CAST(:query_vector AS vector)) as similarity_score
+                FROM ({candidate_query}) AS candidates
+                ORDER BY embedding <#> CAST(:query_vector AS vector) LIMIT :n_results
+                """
                 params["n_results"] = n_results
                 
+                # The default ef_search (40) would silently cap the candidate pool
+                db.execute(_SET_EF_SEARCH, {"ef_search": str(min(params["n_candidates"], MAX_HNSW_EF_SEARCH))})
+                
                 # Execute the query with named parameters
                 result = db.execute(text(sql_query), params)
                 rows = result.fetchall()
@@ -0,0 +1,90 @@
+"""Persistent SQLite cache of document embeddings keyed by model and chunk text"""
+import hashlib
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence
+
+import numpy as np
+
+def embedding_cache_key(model: str, text: str) -> str:
+    """Content-addressed key for the embedding of text under model"""
+    return hashlib.blake2b(model.encode() + b"\0" + text.encode(), digest_size=16).hexdigest()
+
+class EmbeddingCache:
+    """
+    Persistent content-addressed embedding store backed by SQLite
+
+    Vectors are stored as float32 bytes keyed by embedding_cache_key, so
+    identical chunk text (repeated headers/footers, re-ingested documents)
+    is only embedded once per model.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Return cached vectors for the keys that are present"""
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        """Store vectors, replacing any existing entries"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                ((key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items())
+            )
+            self._conn.commit()
+
+    def get_or_compute_many(self, texts: Sequence[str], model: str,
+                            compute: Callable[[List[str]], Sequence[Sequence[float]]]) -> List[np.ndarray]:
+        """
+        Look up embeddings for texts, computing only the misses
+
+        Args:
+            texts: Texts to embed
+            model: Embedding model name (part of the cache key)
+            compute: Called once with the unique missing texts, returns their embeddings in order
+
+        Returns:
+            float32 embeddings aligned with texts
+        """
+        keys = [embedding_cache_key(model, text) for text in texts]
+        vectors = self.get_many(set(keys))
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+
+        if missing:
+            computed = compute(list(missing.values()))
+            new_vectors = {
+                key: np.asarray(vector, dtype=np.float32)
+                for key, vector in zip(missing, computed)
+            }
+            self.put_many(new_vectors)
+            vectors.update(new_vectors)
+
+        return [vectors[key] for key in keys]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,102 @@
+import hashlib
+import mmap
+import os
+from typing import Optional
+
+# Hash used for document change detection (file_hash column)
+FILE_HASH_ALGORITHM = "sha256"
+
+# Extended attribute (or sidecar file suffix) holding "<mtime_ns>:<size>:<hash>"
+HASH_XATTR = f"user.ragreport.{FILE_HASH_ALGORITHM}"
+HASH_SIDECAR_SUFFIX = f".ragreport-{FILE_HASH_ALGORITHM}"
+
+def compute_file_hash(file_path: str, algorithm: str = FILE_HASH_ALGORITHM) -> str:
+    """
+    Compute the hex digest of a file's contents
+
+    Uses hashlib.file_digest (Python 3.11+), which hands the file descriptor
+    to OpenSSL and its hardware-accelerated (SHA-NI / ARMv8) implementation.
+    Older Pythons feed a read-only mmap of the file to a single update() call.
+
+    Args:
+        file_path: Path to the file
+        algorithm: hashlib algorithm name
+
+    Returns:
+        Hex digest of the file contents
+    """
+    with open(file_path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, algorithm).hexdigest()
+
+        digest = hashlib.new(algorithm)
+        # mmap cannot map an empty file
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+        return digest.hexdigest()
+
+def _stamp(st: os.stat_result) -> str:
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+def get_cached_file_hash(file_path: str, st: Optional[os.stat_result] = None) -> Optional[str]:
+    """
+    Return the file hash recorded for file_path if the file is unchanged
+
+    The hash is read from an extended attribute, falling back to a sidecar
+    file on platforms/filesystems without xattr support. It is only trusted
+    when the recorded mtime and size still match the file.
+
+    Args:
+        file_path: Path to the file
+        st: Optional stat result for file_path, to avoid a second stat call
+
+    Returns:
+        The cached hash, or None if absent or stale
+    """
+    st = st or os.stat(file_path)
+    value = None
+
+    if hasattr(os, "getxattr"):
+        try:
+            value = os.getxattr(file_path, HASH_XATTR).decode()
+        except OSError:
+            value = None
+
+    if value is None:
+        try:
+            with open(file_path + HASH_SIDECAR_SUFFIX, "r") as f:
+                value = f.read().strip()
+        except OSError:
+            return None
+
+    stamp, _, file_hash = value.rpartition(":")
+    if stamp != _stamp(st) or not file_hash:
+        return None
+    return file_hash
+
+def set_cached_file_hash(file_path: str, file_hash: str, st: Optional[os.stat_result] = None) -> None:
+    """
+    Record file_hash for file_path along with its current mtime and size
+
+    Args:
+        file_path: Path to the file
+        file_hash: Hash computed from the file contents
+        st: Stat result taken before the hash was computed
+    """
+    st = st or os.stat(file_path)
+    value = f"{_stamp(st)}:{file_hash}"
+
+    if hasattr(os, "setxattr"):
+        try:
+            os.setxattr(file_path, HASH_XATTR, value.encode())
+            return
+        except OSError:
+            pass
+
+    try:
+        with open(file_path + HASH_SIDECAR_SUFFIX, "w") as f:
+            f.write(value)
+    except OSError:
+        # Caching is best effort; the hash is simply recomputed next time
+        pass
@@ -1,17 +1,29 @@
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
 from datetime import datetime
 from pathlib import Path
 
-def setup_logging(log_level: str = "INFO", log_dir: str = "logs") -> None:
+# Listener threads started when logging is routed through queues
+_queue_listeners = []
+# (logger, handlers) pairs moved behind a queue, so workers can restore them
+_queued_handlers = []
+
+def setup_logging(log_level: str = "INFO", log_dir: str = "logs", use_queue: bool = False) -> None:
     """
     Setup comprehensive logging configuration with file and console handlers
     
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_dir: Directory to store log files
+        use_queue: Route records through QueueHandler/QueueListener so callers only
+            enqueue and a background thread formats and writes them
     """
+    # Stop listeners from a previous setup before replacing their handlers
+    stop_queue_logging()
+    
     # Create logs directory if it doesn't exist
     log_path = Path(log_dir)
     log_path.mkdir(exist_ok=True)
@@ -148,9 +160,45 @@ def setup_logging(log_level: str = "INFO", log_dir: str = "logs") -> None:
     if not any(isinstance(h, logging.StreamHandler) for h in root_logger.handlers):
         root_logger.addHandler(console_handler)
 
+    if use_queue:
+        _enable_queue_logging([root_logger, db_logger, api_logger, vector_logger, doc_logger, rag_logger])
+
     # Test log to verify file creation
     root_logger.debug("[LOGGING] errors.log file handler initialized and ready.")
 
+def _enable_queue_logging(loggers) -> None:
+    """Move each logger's handlers behind a queue drained by a listener thread"""
+    for queued_logger in loggers:
+        handlers = list(dict.fromkeys(queued_logger.handlers))
+        if not handlers:
+            continue
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        queued_logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+        listener.start()
+        _queue_listeners.append(listener)
+        _queued_handlers.append((queued_logger, handlers))
+
+def stop_queue_logging() -> None:
+    """Flush and stop queue listener threads started by setup_logging"""
+    while _queue_listeners:
+        _queue_listeners.pop().stop()
+    _queued_handlers.clear()
+
+def restore_direct_logging() -> None:
+    """
+    Put the real handlers back in place of QueueHandlers. Call this in worker
+    processes: forked ones inherit the in-process queues but not the listener threads,
+    so anything enqueued there would never be written, and spawned ones need no
+    listener thread of their own.
+    """
+    for queued_logger, handlers in _queued_handlers:
+        queued_logger.handlers = list(handlers)
+    _queued_handlers.clear()
+    _queue_listeners.clear()
+
+atexit.register(stop_queue_logging)
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger instance with the specified name
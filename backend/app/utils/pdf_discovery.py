@@ -0,0 +1,47 @@
+import stat
+from pathlib import Path
+from typing import Iterable, List
+
+# Default documents loaded into the vector database
+DEFAULT_DOCUMENTS = ("Instructions.pdf", "Rules.pdf")
+
+# Locations searched for test PDFs (files or directories, relative to project root)
+TEST_PDF_LOCATIONS = DEFAULT_DOCUMENTS + ("data", "TestData", "backend/data")
+
+def discover_pdfs(project_root: Path, locations: Iterable[str] = TEST_PDF_LOCATIONS) -> List[Path]:
+    """
+    Discover PDF files under an allow-list of project locations
+
+    Each location is stat'ed exactly once: files are kept if they are PDFs,
+    directories are searched recursively with a single rglob.
+
+    Args:
+        project_root: Project root directory
+        locations: File or directory names relative to project_root
+
+    Returns:
+        De-duplicated PDF paths, in allow-list order and sorted within directories
+    """
+    pdf_files = []
+    seen = set()
+
+    for location in locations:
+        candidate = Path(project_root) / location
+        try:
+            mode = candidate.stat().st_mode
+        except OSError:
+            continue
+
+        if stat.S_ISDIR(mode):
+            matches = sorted(candidate.rglob("*.pdf"))
+        elif stat.S_ISREG(mode) and candidate.suffix.lower() == ".pdf":
+            matches = [candidate]
+        else:
+            matches = []
+
+        for match in matches:
+            if match not in seen:
+                seen.add(match)
+                pdf_files.append(match)
+
+    return pdf_files
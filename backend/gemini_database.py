@@ -3,14 +3,22 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.dialects.postgresql import ARRAY
 from pgvector.sqlalchemy import Vector
+from app.models.database import check_pgvector_version
 from datetime import datetime
+import logging
 import os
-from typing import List
+from itertools import combinations
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 Base = declarative_base()
 
+logger = logging.getLogger(__name__)
+
+# Gemini embeddings are requested truncated to this many dimensions (Matryoshka output_dimensionality)
+EMBEDDING_DIMENSIONS = 384
+
 class GeminiDocumentChunk(Base):
-    """Database model for document chunks with Gemini vector embeddings (768 dimensions)"""
+    """Database model for document chunks with Gemini vector embeddings (EMBEDDING_DIMENSIONS dimensions)"""
     __tablename__ = "gemini_document_chunks"
     
     id = Column(Integer, primary_key=True, index=True)
@@ -20,7 +28,7 @@ class GeminiDocumentChunk(Base):
     chunk_type = Column(String(100), index=True, nullable=False)
     page_number = Column(Integer, nullable=True)
     file_hash = Column(String(64), index=True, nullable=False)
-    embedding = Column(Vector(768), nullable=False)  # Gemini embedding dimension
+    embedding = Column(Vector(EMBEDDING_DIMENSIONS), nullable=False)  # Reduced Gemini embedding dimension
     chunk_metadata = Column(Text, nullable=True)  # JSON string
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -30,6 +38,88 @@ Index('idx_gemini_document_chunks_document_name', GeminiDocumentChunk.document_n
 Index('idx_gemini_document_chunks_chunk_type', GeminiDocumentChunk.chunk_type)
 Index('idx_gemini_document_chunks_file_hash', GeminiDocumentChunk.file_hash)
 
+# Half-precision ANN candidates fetched per requested result, re-ranked in full precision
+RERANK_CANDIDATE_FACTOR = 4
+
+# Minimum HNSW search breadth; raised per query so the index returns every candidate
+HNSW_EF_SEARCH = 64
+
+# Upper bound pgvector accepts for hnsw.ef_search
+MAX_HNSW_EF_SEARCH = 1000
+
+# Metadata columns similarity search can filter on
+SEARCH_FILTER_COLUMNS = ("document_name", "chunk_type", "file_hash")
+_SEARCH_FILTER_SET = frozenset(SEARCH_FILTER_COLUMNS)
+
+# Rows fetched per round trip when streaming search results from a server-side cursor
+SEARCH_YIELD_PER = 64
+
+def _build_search_statement(filter_keys: Tuple[str, ...]):
+    """Similarity search statement filtering on exactly filter_keys"""
+    where = ""
+    if filter_keys:
+        where = "WHERE " + " AND ".join(f"{key} = :{key}" for key in filter_keys)
+    
+    # Coarse candidate fetch on the half-precision column, then re-rank the
+    # candidates by full-precision inner product (cosine, as embeddings are unit-normalized)
+    return text(f"""
+        SELECT 
+            content,
+            chunk_metadata,
+            chunk_type,
+            document_name,
+            page_number,
+            -(embedding <#> CAST(:query_vector AS vector)) as similarity_score
+        FROM (
+            SELECT 
+                content,
+                chunk_metadata,
+                chunk_type,
+                document_name,
+                page_number,
+                embedding
+            FROM gemini_document_chunks
+            {where}
+            ORDER BY embedding_half <#> CAST(:query_vector AS halfvec({EMBEDDING_DIMENSIONS}))
+            LIMIT :n_candidates
+        ) AS candidates
+        ORDER BY similarity_score DESC LIMIT :n_results
+    """).execution_options(stream_results=True, yield_per=SEARCH_YIELD_PER)
+
+# One prebuilt statement per subset of filter columns, so the SQL text is identical across
+# calls (SQLAlchemy reuses the compiled form and psycopg can prepare it server-side)
+_SEARCH_STATEMENTS = {
+    frozenset(keys): _build_search_statement(keys)
+    for size in range(len(SEARCH_FILTER_COLUMNS) + 1)
+    for keys in combinations(SEARCH_FILTER_COLUMNS, size)
+}
+
+# Transaction-local ef_search, bound as a parameter so the statement text never changes
+_SET_EF_SEARCH = text("SELECT set_config('hnsw.ef_search', :ef_search, true)")
+
+def search_chunks(db, query_vector: List[float], n_results: int,
+                  filter_metadata: Optional[Dict[str, Any]] = None) -> Iterable[tuple]:
+    """
+    Nearest chunks to a unit-normalized query vector
+
+    Yields rows of (content, chunk_metadata, chunk_type, document_name,
+    page_number, similarity_score), most similar first, streamed from a
+    server-side cursor; consume them before the session is closed.
+    Unsupported filter keys are ignored.
+    """
+    filters = filter_metadata or {}
+    filter_keys = _SEARCH_FILTER_SET.intersection(filters)
+    
+    params = {key: filters[key] for key in filter_keys}
+    params["query_vector"] = query_vector
+    params["n_candidates"] = RERANK_CANDIDATE_FACTOR * n_results
+    params["n_results"] = n_results
+    
+    # HNSW returns at most ef_search rows, so size it to the candidate count (within pgvector's limit)
+    ef_search = min(max(HNSW_EF_SEARCH, params["n_candidates"]), MAX_HNSW_EF_SEARCH)
+    db.execute(_SET_EF_SEARCH, {"ef_search": str(ef_search)})
+    return db.execute(_SEARCH_STATEMENTS[filter_keys], params)
+
 def get_database_url():
     """Get database URL from environment variables"""
     host = os.getenv("POSTGRES_HOST", "localhost")
@@ -46,8 +136,11 @@ def create_database_engine():
     engine = create_engine(
         database_url,
         echo=False,  # Set to True for SQL debugging
+        # Sized for concurrent ingestion and searches (the default pool of 5 makes them queue)
+        pool_size=int(os.getenv("POSTGRES_POOL_SIZE", "32")),
+        max_overflow=int(os.getenv("POSTGRES_MAX_OVERFLOW", "16")),
         pool_pre_ping=True,
-        pool_recycle=300
+        pool_recycle=1800
     )
     return engine
 
@@ -57,15 +150,58 @@ def create_session_factory():
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     return SessionLocal, engine
 
-def init_gemini_database():
-    """Initialize Gemini database tables and pgvector extension"""
+# Set to 1 to let startup drop a gemini_document_chunks table holding embeddings of another size
+DROP_MISMATCHED_EMBEDDINGS_ENV = "GEMINI_DROP_MISMATCHED_EMBEDDINGS"
+
+def init_gemini_database(drop_mismatched_embeddings: Optional[bool] = None):
+    """
+    Initialize Gemini database tables and pgvector extension
+
+    A stored table whose embeddings are not EMBEDDING_DIMENSIONS wide cannot be
+    converted. It is only dropped (deleting every ingested chunk) when
+    drop_mismatched_embeddings is set, or GEMINI_DROP_MISMATCHED_EMBEDDINGS=1;
+    otherwise initialization fails.
+    """
+    if drop_mismatched_embeddings is None:
+        drop_mismatched_embeddings = os.getenv(DROP_MISMATCHED_EMBEDDINGS_ENV) == "1"
     engine = create_database_engine()
     
-    # Enable pgvector extension
-    with engine.connect() as conn:
+    # Enable pgvector extension and create tables/indexes in one transaction
+    with engine.begin() as conn:
         conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
-        conn.commit()
-    
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+        # The halfvec column and index need a recent pgvector
+        check_pgvector_version(conn)
+        
+        # Stored embeddings of another size cannot be converted; dropping them needs an explicit opt-in
+        stored_dimensions = conn.execute(text(
+            "SELECT atttypmod FROM pg_attribute "
+            "WHERE attrelid = to_regclass('gemini_document_chunks') AND attname = 'embedding'"
+        )).scalar()
+        if stored_dimensions is not None and stored_dimensions != EMBEDDING_DIMENSIONS:
+            if not drop_mismatched_embeddings:
+                raise RuntimeError(
+                    f"gemini_document_chunks stores {stored_dimensions}-dimension embeddings but "
+                    f"{EMBEDDING_DIMENSIONS} are configured; set {DROP_MISMATCHED_EMBEDDINGS_ENV}=1 "
+                    f"to drop the table and re-ingest the documents"
+                )
+            dropped_chunks = conn.execute(text("SELECT count(*) FROM gemini_document_chunks")).scalar()
+            logger.warning(
+                f"Dropping gemini_document_chunks: {dropped_chunks} chunks with {stored_dimensions}-dimension "
+                f"embeddings (now {EMBEDDING_DIMENSIONS}); documents must be re-ingested"
+            )
+            conn.execute(text("DROP TABLE gemini_document_chunks"))
+        
+        Base.metadata.create_all(bind=conn, checkfirst=True)
+        
+        # Half-precision copy of the embedding (half the bytes) scanned for ANN candidates
+        conn.execute(text(
+            f"ALTER TABLE gemini_document_chunks ADD COLUMN IF NOT EXISTS embedding_half halfvec({EMBEDDING_DIMENSIONS}) "
+            f"GENERATED ALWAYS AS (embedding::halfvec({EMBEDDING_DIMENSIONS})) STORED"
+        ))
+        # Embeddings are unit-normalized, so the index ranks by inner product
+        conn.execute(text("DROP INDEX IF EXISTS idx_gemini_document_chunks_embedding_half_hnsw"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS idx_gemini_document_chunks_embedding_half_ip_hnsw "
+            "ON gemini_document_chunks USING hnsw (embedding_half halfvec_ip_ops)"
+        ))
     return engine 
\ No newline at end of file
@@ -1,16 +1,25 @@
 import os
-import asyncio
+import hashlib
 import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 import logging
 from datetime import datetime
 import uuid
 import PyPDF2
+import numpy as np
 from io import BytesIO
 
+from app.utils.file_hash_cache import FILE_HASH_ALGORITHM
+
 logger = logging.getLogger(__name__)
 
+# Patterns compiled once at import time and shared by all processors
+_SENTENCE_ENDINGS_RE = re.compile(r'[.!?]+\s+')
+_PARAGRAPH_BREAKS_RE = re.compile(r'\n\s*\n')
+_WHITESPACE_RE = re.compile(r'\s+')
+_CAMEL_CASE_JOIN_RE = re.compile(r'([a-z])([A-Z])')
+
 class DocumentChunk:
     """Represents a chunk of text from a document"""
     def __init__(self, content: str, chunk_id: str, metadata: Dict[str, Any] = None):
@@ -34,18 +43,18 @@ class GeminiDocumentProcessor:
         self.min_chunk_size = min_chunk_size
         
         # Sentence endings for better chunking
-        self.sentence_endings = re.compile(r'[.!?]+\s+')
+        self.sentence_endings = _SENTENCE_ENDINGS_RE
         
         # Paragraph breaks
-        self.paragraph_breaks = re.compile(r'\n\s*\n')
+        self.paragraph_breaks = _PARAGRAPH_BREAKS_RE
         
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text"""
         # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE_RE.sub(' ', text)
         
         # Fix common PDF extraction issues
-        text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
+        text = _CAMEL_CASE_JOIN_RE.sub(r'\1 \2', text)
         
         # Remove very short lines that might be artifacts
         lines = text.split('\n')
@@ -188,43 +197,47 @@ class GeminiDocumentProcessor:
     
     async def process_pdf(self, file_path: str) -> List[DocumentChunk]:
         """Process PDF file and return chunks"""
+        with open(file_path, 'rb') as file:
+            return self._process_stream(file, file_path)
+    
+    def _process_stream(self, stream, file_path: str) -> List[DocumentChunk]:
+        """Extract and chunk the pages of a PDF stream"""
         try:
             chunks = []
             
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                for page_num, page in enumerate(pdf_reader.pages, 1):
-                    # Extract text from page
-                    text = page.extract_text()
-                    
-                    if not text.strip():
-                        continue
-                    
-                    # Clean the text
-                    cleaned_text = self._clean_text(text)
-                    
-                    if len(cleaned_text) < self.min_chunk_size:
-                        continue
-                    
-                    # Metadata for this page
-                    page_metadata = {
-                        'document_name': os.path.basename(file_path),
-                        'page_number': page_num,
-                        'source_file': file_path,
-                        'chunk_type': 'general',
-                        'processing_timestamp': datetime.now().isoformat()
-                    }
-                    
-                    # Try paragraph-based chunking first
-                    page_chunks = self._create_chunks_from_text(cleaned_text, page_metadata)
-                    
-                    # If chunks are too large, use sentence-based fallback
-                    if any(len(chunk.content) > self.max_chunk_size * 1.2 for chunk in page_chunks):
-                        page_chunks = self._fallback_chunking(cleaned_text, page_metadata)
-                    
-                    chunks.extend(page_chunks)
+            pdf_reader = PyPDF2.PdfReader(stream)
             
+            for page_num, page in enumerate(pdf_reader.pages, 1):
+                # Extract text from page
+                text = page.extract_text()
+                
+                if not text.strip():
+                    continue
+                
+                # Clean the text
+                cleaned_text = self._clean_text(text)
+                
+                if len(cleaned_text) < self.min_chunk_size:
+                    continue
+                
+                # Metadata for this page
+                page_metadata = {
+                    'document_name': os.path.basename(file_path),
+                    'page_number': page_num,
+                    'source_file': file_path,
+                    'chunk_type': 'general',
+                    'processing_timestamp': datetime.now().isoformat()
+                }
+                
+                # Try paragraph-based chunking first
+                page_chunks = self._create_chunks_from_text(cleaned_text, page_metadata)
+                
+                # If chunks are too large, use sentence-based fallback
+                if any(len(chunk.content) > self.max_chunk_size * 1.2 for chunk in page_chunks):
+                    page_chunks = self._fallback_chunking(cleaned_text, page_metadata)
+                
+                chunks.extend(page_chunks)
+        
             logger.info(f"Processed {file_path}: {len(chunks)} chunks created")
             return chunks
             
@@ -237,13 +250,46 @@ class GeminiDocumentProcessor:
         if not chunks:
             return {"total_chunks": 0}
         
-        sizes = [len(chunk.content) for chunk in chunks]
+        # Single pass over the chunks, then vectorized reductions
+        sizes = np.fromiter((len(chunk.content) for chunk in chunks), dtype=np.int32, count=len(chunks))
+        
+        # Size distribution in 100-character buckets
+        histogram = np.bincount(sizes // 100)
+        size_distribution = {
+            f"{bucket * 100}-{bucket * 100 + 99}": int(count)
+            for bucket, count in enumerate(histogram) if count
+        }
         
         return {
             "total_chunks": len(chunks),
-            "average_size": sum(sizes) / len(sizes),
-            "min_size": min(sizes),
-            "max_size": max(sizes),
+            "average_size": float(sizes.mean()),
+            "min_size": int(sizes.min()),
+            "max_size": int(sizes.max()),
+            "std_size": float(sizes.std()),
+            "size_distribution": size_distribution,
             "chunking_method": "character-based (no tiktoken)",
             "overlap_strategy": "sentence-aware"
-        } 
\ No newline at end of file
+        }
+
+# Per-process document processor, built once by init_worker_processor
+_worker_processor: Optional[GeminiDocumentProcessor] = None
+
+def init_worker_processor(max_chunk_size: int, chunk_overlap: int, min_chunk_size: int):
+    """Build one document processor per worker process (ProcessPoolExecutor initializer)"""
+    global _worker_processor
+    _worker_processor = GeminiDocumentProcessor(
+        max_chunk_size=max_chunk_size,
+        chunk_overlap=chunk_overlap,
+        min_chunk_size=min_chunk_size
+    )
+
+def extract_chunks(file_path: str, compute_hash: bool = True) -> Tuple[Optional[str], List[DocumentChunk]]:
+    """
+    Hash, parse and chunk a PDF from a single read of the file (runs in a worker process)
+
+    Returns:
+        (file hash or None when compute_hash is False, chunks)
+    """
+    data = Path(file_path).read_bytes()
+    file_hash = hashlib.new(FILE_HASH_ALGORITHM, data).hexdigest() if compute_hash else None
+    return file_hash, _worker_processor._process_stream(BytesIO(data), file_path)
@@ -10,17 +10,28 @@ Usage:
     # Or with custom PDF files
     python load_pdfs_to_vector_db.py --pdf-files path/to/file1.pdf path/to/file2.pdf
     
+    # Or with a newline-delimited list of paths / a directory (for large batches)
+    python load_pdfs_to_vector_db.py --pdf-list pdfs.txt
+    python load_pdfs_to_vector_db.py --pdf-dir path/to/pdfs
+    
     # Or to reload existing documents
     python load_pdfs_to_vector_db.py --reload
 """
 
 import os
 import sys
+import json
+import time
 import asyncio
 import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
+import PyPDF2
 from dotenv import load_dotenv
+from sqlalchemy import delete, func, insert
 
 # Add the backend directory to Python path
 backend_dir = Path(__file__).parent
@@ -31,17 +42,97 @@ load_dotenv()
 
 # Import after path setup
 from app.services.vector_service import PostgreSQLVectorService
-from app.services.document_processor import DocumentProcessor
-from app.utils.logging_config import setup_logging, get_logger
+from app.services.document_processor import DocumentProcessor, DocumentChunk
+from app.models.database import DocumentChunk as DBDocumentChunk
+from app.utils.logging_config import setup_logging, get_logger, restore_direct_logging
+from app.utils.pdf_discovery import discover_pdfs, DEFAULT_DOCUMENTS
+from app.utils.file_hash_cache import get_cached_file_hash, set_cached_file_hash
 
 # Setup logging
-setup_logging(log_level="INFO", log_dir="logs")
+setup_logging(log_level="INFO", log_dir="logs", use_queue=True)
 logger = get_logger("pdf_loader")
 
+# End-of-stream marker passed between pipeline stages
+_SENTINEL = None
+
+# Worker processes are spawned, not forked: this process runs the queue logging listener threads
+_SPAWN = multiprocessing.get_context("spawn")
+
+# Per-process document processor, built once by _worker_init
+_worker_processor: Optional[DocumentProcessor] = None
+
+def _worker_init():
+    """Build one document processor per worker process and log directly from it"""
+    global _worker_processor
+    restore_direct_logging()
+    _worker_processor = DocumentProcessor()
+
+def _parse_pdf(file_path: str) -> List[DocumentChunk]:
+    """Parse a PDF into chunks (runs in a worker process)"""
+    if _worker_processor is None:
+        _worker_init()
+    return _worker_processor._process_file(file_path)
+
+def _preflight_pdf(file_path: str) -> Optional[str]:
+    """Check a PDF opens and has an extractable first page (runs in a worker process)"""
+    try:
+        reader = PyPDF2.PdfReader(file_path, strict=False)
+        if len(reader.pages) == 0:
+            return "no pages"
+        reader.pages[0].extract_text()
+    except Exception as e:
+        return f"unreadable ({str(e)})"
+    return None
+
+class ProgressLogger:
+    """
+    Log aggregated pipeline progress every log_every files, e.g.
+    '[200/10000] avg 120 chunks/file, 1250ms/file - ETA 1m 39s @ 120/min'
+    """
+    
+    def __init__(self, total: int, log_every: int = 100):
+        self.total = total
+        self.log_every = log_every
+        self.done = 0
+        self.chunks = 0
+        self.start_time = time.monotonic()
+    
+    def advance(self, count: int = 1, chunks: int = 0):
+        previous = self.done
+        self.done += count
+        self.chunks += chunks
+        if self.done // self.log_every == previous // self.log_every and self.done < self.total:
+            return
+        
+        elapsed = time.monotonic() - self.start_time
+        rate = self.done / elapsed * 60 if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate * 60 if rate > 0 else 0.0
+        logger.info(
+            f"[{self.done}/{self.total}] avg {self.chunks / self.done:.0f} chunks/file, "
+            f"{elapsed * 1000 / self.done:.0f}ms/file - "
+            f"ETA {int(eta // 60)}m {int(eta % 60)}s @ {rate:.0f}/min"
+        )
+
 class PDFLoader:
-    def __init__(self):
+    def __init__(self,
+                 parse_workers: Optional[int] = None,
+                 embed_workers: int = 4,
+                 queue_size: int = 8,
+                 flush_rows: int = 500,
+                 flush_interval: float = 1.0,
+                 max_file_size: int = 100 * 1024 * 1024):
         self.vector_service = None
         self.document_processor = None
+        
+        # Pipeline configuration (parse -> embed -> insert)
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.embed_workers = embed_workers
+        self.queue_size = queue_size
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        
+        # Files larger than this (bytes) are rejected during preflight
+        self.max_file_size = max_file_size
     
     async def initialize(self):
         """Initialize the vector service and document processor"""
@@ -52,8 +143,8 @@ class PDFLoader:
             self.vector_service = PostgreSQLVectorService()
             await self.vector_service.initialize_database()
             
-            # Initialize document processor
-            self.document_processor = DocumentProcessor()
+            # Reuse the vector service's document processor
+            self.document_processor = self.vector_service.document_processor
             
             logger.info("PDF loader initialized successfully")
             
@@ -67,20 +158,14 @@ class PDFLoader:
             # Get project root directory
             project_root = Path(__file__).parent.parent
             
-            # Default PDF files
-            default_pdfs = [
-                project_root / "Instructions.pdf",
-                project_root / "Rules.pdf"
-            ]
-            
-            # Filter existing files
-            existing_files = [str(pdf) for pdf in default_pdfs if pdf.exists()]
+            # Default PDF files that exist on disk
+            existing_files = [str(pdf) for pdf in discover_pdfs(project_root, DEFAULT_DOCUMENTS)]
             
             if not existing_files:
                 logger.warning("No default PDF files found in project root")
                 logger.info("Expected files:")
-                for pdf in default_pdfs:
-                    logger.info(f"  - {pdf}")
+                for name in DEFAULT_DOCUMENTS:
+                    logger.info(f"  - {project_root / name}")
                 return False
             
             logger.info(f"Found {len(existing_files)} PDF files to process")
@@ -100,48 +185,56 @@ class PDFLoader:
         try:
             logger.info(f"Processing {len(pdf_files)} PDF files...")
             
-            # Validate files exist
-            for pdf_file in pdf_files:
-                if not os.path.exists(pdf_file):
-                    logger.error(f"PDF file not found: {pdf_file}")
-                    return False
+            # Stat each file once; the result is reused for the hash cache
+            try:
+                entries = [(pdf_file, os.path.basename(pdf_file), os.stat(pdf_file)) for pdf_file in pdf_files]
+            except FileNotFoundError as e:
+                logger.error(f"PDF file not found: {e.filename}")
+                return False
             
-            # Process each PDF
+            # Documents are stored by file name, so a second file with the same name
+            # would replace the first one's chunks; only the first is loaded
+            seen_names = {}
+            unique_entries = []
+            duplicates = []
+            for entry in entries:
+                if entry[1] in seen_names:
+                    duplicates.append(f"{entry[0]} (same name as {seen_names[entry[1]]})")
+                else:
+                    seen_names[entry[1]] = entry[0]
+                    unique_entries.append(entry)
+            if duplicates:
+                logger.error(f"Rejected {len(duplicates)} files with duplicate names: " + "; ".join(duplicates))
+                entries = unique_entries
+            
+            # Skip files that are already stored with the same hash, checked
+            # against one bulk snapshot instead of a query per file
+            stored_hashes, chunk_counts = self._load_stored_documents()
             total_chunks = 0
-            for i, pdf_file in enumerate(pdf_files, 1):
-                logger.info(f"Processing PDF {i}/{len(pdf_files)}: {os.path.basename(pdf_file)}")
-                
-                # Check if already processed
-                file_hash = self.vector_service._get_file_hash(pdf_file)
-                doc_name = os.path.basename(pdf_file)
-                
-                # Check if document already exists with same hash
-                with self.vector_service.SessionLocal() as db:
-                    from app.models.database import DBDocumentChunk
-                    existing = db.query(DBDocumentChunk).filter(
-                        DBDocumentChunk.document_name == doc_name,
-                        DBDocumentChunk.file_hash == file_hash
-                    ).first()
-                    
-                    if existing:
-                        chunk_count = db.query(DBDocumentChunk).filter(
-                            DBDocumentChunk.document_name == doc_name
-                        ).count()
-                        logger.info(f"  ✅ Already processed: {doc_name} ({chunk_count} chunks)")
-                        total_chunks += chunk_count
-                        continue
-                
-                # Process the PDF
-                result = await self.vector_service.add_documents([pdf_file])
+            pending = []
+            for pdf_file, doc_name, st in entries:
+                file_hash = self._get_file_hash(pdf_file, st)
                 
-                if result["processed"]:
-                    chunk_count = result["processed"][0]["chunk_count"]
+                if (doc_name, file_hash) in stored_hashes:
+                    chunk_count = chunk_counts.get(doc_name, 0)
+                    logger.debug(f"  ✅ Already processed: {doc_name} ({chunk_count} chunks)")
                     total_chunks += chunk_count
-                    logger.info(f"  ✅ Processed: {doc_name} ({chunk_count} chunks)")
-                else:
-                    logger.error(f"  ❌ Failed to process: {doc_name}")
-                    if result["failed"]:
-                        logger.error(f"    Error: {result['failed'][0]['error']}")
+                    continue
+                
+                pending.append((pdf_file, doc_name, file_hash))
+            
+            skipped = len(entries) - len(pending)
+            if skipped:
+                logger.info(f"Skipping {skipped} already processed files ({total_chunks} chunks)")
+            
+            # Reject unusable files before any embedding spend
+            if pending:
+                sizes = {pdf_file: st.st_size for pdf_file, _, st in entries}
+                pending = await self._preflight(pending, sizes)
+            
+            # Parse, embed and insert the remaining files as overlapping stages
+            if pending:
+                total_chunks += await self._run_pipeline(pending)
             
             logger.info(f"🎉 PDF loading completed! Total chunks: {total_chunks}")
             return True
@@ -150,6 +243,204 @@ class PDFLoader:
             logger.error(f"Error loading PDFs: {str(e)}")
             raise
     
+    async def _preflight(self, pending: List[Tuple[str, str, str]], sizes: dict) -> List[Tuple[str, str, str]]:
+        """Validate size and readability of all files in parallel, returning those that pass"""
+        rejected = []
+        candidates = []
+        for file_info in pending:
+            if sizes[file_info[0]] > self.max_file_size:
+                rejected.append((file_info[1], f"larger than {self.max_file_size} bytes"))
+            else:
+                candidates.append(file_info)
+        
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=_SPAWN,
+                                 initializer=restore_direct_logging) as pool:
+            reasons = await asyncio.gather(*(
+                loop.run_in_executor(pool, _preflight_pdf, file_info[0]) for file_info in candidates
+            ))
+        
+        passed = []
+        for file_info, reason in zip(candidates, reasons):
+            if reason is None:
+                passed.append(file_info)
+            else:
+                rejected.append((file_info[1], reason))
+        
+        if rejected:
+            logger.warning(
+                f"Preflight rejected {len(rejected)} files: "
+                + "; ".join(f"{doc_name}: {reason}" for doc_name, reason in rejected)
+            )
+        return passed
+    
+    async def _run_pipeline(self, pending: List[Tuple[str, str, str]]) -> int:
+        """
+        Run parse -> embed -> insert as concurrent stages joined by bounded queues,
+        so wall time approaches the slowest stage rather than the sum of all stages
+        """
+        loop = asyncio.get_running_loop()
+        parse_queue = asyncio.Queue(maxsize=self.queue_size)
+        insert_queue = asyncio.Queue(maxsize=self.queue_size)
+        progress = ProgressLogger(len(pending))
+        inserted = {"chunks": 0}
+        
+        def fail(file_info: Tuple[str, str, str], error: str):
+            logger.error(f"  ❌ Failed to process: {file_info[1]}")
+            logger.error(f"    Error: {error}")
+            progress.advance()
+        
+        async def parse_worker():
+            # CPU-bound PDF parsing in worker processes, bounded number in flight
+            try:
+                with ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=_SPAWN,
+                                         initializer=_worker_init) as pool:
+                    in_flight = deque()
+                    files = iter(pending)
+                    while True:
+                        while len(in_flight) < self.parse_workers * 2:
+                            file_info = next(files, None)
+                            if file_info is None:
+                                break
+                            try:
+                                # Submitting to a broken pool raises here rather than from the future
+                                in_flight.append((file_info, loop.run_in_executor(pool, _parse_pdf, file_info[0])))
+                            except Exception as e:
+                                fail(file_info, str(e))
+                        if not in_flight:
+                            break
+                        file_info, future = in_flight.popleft()
+                        try:
+                            chunks = await future
+                        except Exception as e:
+                            fail(file_info, str(e))
+                            continue
+                        await parse_queue.put((file_info, chunks))
+            finally:
+                # Always release the embed workers, or they (and the insert worker) wait forever
+                for _ in range(self.embed_workers):
+                    await parse_queue.put(_SENTINEL)
+        
+        async def embed_worker():
+            # Network-bound embedding calls, embed_workers requests in flight
+            while (item := await parse_queue.get()) is not _SENTINEL:
+                file_info, chunks = item
+                if not chunks:
+                    logger.warning(f"No chunks extracted from {file_info[0]}")
+                    progress.advance()
+                    continue
+                try:
+                    embeddings = await self.vector_service._generate_embeddings(
+                        [chunk.content for chunk in chunks]
+                    )
+                except Exception as e:
+                    fail(file_info, str(e))
+                    continue
+                await insert_queue.put((file_info, chunks, embeddings))
+            await insert_queue.put(_SENTINEL)
+        
+        async def insert_worker():
+            # Single DB writer: flush every flush_rows chunks or flush_interval seconds
+            rows, files = [], []
+            remaining = self.embed_workers
+            last_flush = loop.time()
+            while remaining:
+                try:
+                    item = await asyncio.wait_for(insert_queue.get(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    item = False
+                
+                if item is _SENTINEL:
+                    remaining -= 1
+                elif item:
+                    file_info, chunks, embeddings = item
+                    file_rows = self._chunk_rows(file_info, chunks, embeddings)
+                    rows.extend(file_rows)
+                    files.append((file_info, file_rows))
+                
+                due = len(rows) >= self.flush_rows or loop.time() - last_flush >= self.flush_interval
+                if rows and (due or not remaining):
+                    try:
+                        await asyncio.to_thread(self._insert_rows, rows)
+                        stored = files
+                    except Exception as e:
+                        # One bad file rolls back the whole batch; retry file by file so only it fails
+                        logger.warning(f"Batch insert of {len(files)} files failed ({str(e)}); retrying file by file")
+                        stored = []
+                        for file_info, file_rows in files:
+                            try:
+                                await asyncio.to_thread(self._insert_rows, file_rows)
+                            except Exception as file_error:
+                                fail(file_info, str(file_error))
+                            else:
+                                stored.append((file_info, file_rows))
+                    chunk_total = 0
+                    for file_info, file_rows in stored:
+                        chunk_total += len(file_rows)
+                        logger.debug(f"  ✅ Processed: {file_info[1]} ({len(file_rows)} chunks)")
+                    inserted["chunks"] += chunk_total
+                    progress.advance(len(stored), chunk_total)
+                    rows, files = [], []
+                    last_flush = loop.time()
+        
+        await asyncio.gather(
+            parse_worker(),
+            *(embed_worker() for _ in range(self.embed_workers)),
+            insert_worker()
+        )
+        return inserted["chunks"]
+    
+    def _load_stored_documents(self) -> Tuple[set, dict]:
+        """Fetch stored (document_name, file_hash) pairs and chunk counts per document"""
+        stored_hashes = set()
+        chunk_counts = {}
+        with self.vector_service.SessionLocal() as db:
+            rows = db.query(
+                DBDocumentChunk.document_name,
+                DBDocumentChunk.file_hash,
+                func.count(DBDocumentChunk.id)
+            ).group_by(DBDocumentChunk.document_name, DBDocumentChunk.file_hash).all()
+        
+        for doc_name, file_hash, chunk_count in rows:
+            stored_hashes.add((doc_name, file_hash))
+            chunk_counts[doc_name] = chunk_counts.get(doc_name, 0) + chunk_count
+        return stored_hashes, chunk_counts
+    
+    def _get_file_hash(self, pdf_file: str, st: os.stat_result) -> str:
+        """Get a file's hash, reusing the cached value when mtime and size are unchanged"""
+        file_hash = get_cached_file_hash(pdf_file, st)
+        if file_hash is None:
+            file_hash = self.vector_service._get_file_hash(pdf_file)
+            set_cached_file_hash(pdf_file, file_hash, st)
+        return file_hash
+    
+    @staticmethod
+    def _chunk_rows(file_info: Tuple[str, str, str], chunks: List[DocumentChunk], embeddings: List[List[float]]) -> List[dict]:
+        """Build insert rows for a file's chunks"""
+        _, doc_name, file_hash = file_info
+        return [
+            {
+                "chunk_id": chunk.chunk_id,
+                "document_name": doc_name,
+                "content": chunk.content,
+                "chunk_type": chunk.metadata.get("chunk_type", "general"),
+                "page_number": chunk.metadata.get("page_number", 1),
+                "file_hash": file_hash,
+                "embedding": embedding,
+                "chunk_metadata": json.dumps(chunk.metadata)
+            }
+            for chunk, embedding in zip(chunks, embeddings)
+        ]
+    
+    def _insert_rows(self, rows: List[dict]):
+        """Bulk insert chunk rows in a single executemany round trip"""
+        with self.vector_service.SessionLocal() as db:
+            # Replace any previously stored version of these documents
+            doc_names = {row["document_name"] for row in rows}
+            db.execute(delete(DBDocumentChunk).where(DBDocumentChunk.document_name.in_(doc_names)))
+            db.execute(insert(DBDocumentChunk), rows)
+            db.commit()
+    
     async def reload_all_documents(self):
         """Reload all documents (clear existing and reprocess)"""
         try:
@@ -191,6 +482,8 @@ async def main():
     """Main function"""
     parser = argparse.ArgumentParser(description="Load PDF files into vector database")
     parser.add_argument("--pdf-files", nargs="+", help="Specific PDF files to load")
+    parser.add_argument("--pdf-list", help="File with newline-delimited PDF paths to load")
+    parser.add_argument("--pdf-dir", help="Directory to search recursively for PDF files to load")
     parser.add_argument("--reload", action="store_true", help="Reload all documents")
     parser.add_argument("--status", action="store_true", help="Show current document status")
     
@@ -213,10 +506,17 @@ async def main():
             await loader.get_status()
             return
         
+        # Collect PDF files from the command line, a path list file and/or a directory
+        pdf_files = list(args.pdf_files or [])
+        if args.pdf_list:
+            pdf_files.extend(line.strip() for line in Path(args.pdf_list).read_text().splitlines() if line.strip())
+        if args.pdf_dir:
+            pdf_files.extend(str(pdf) for pdf in sorted(Path(args.pdf_dir).rglob("*.pdf")))
+        
         # Load specific PDF files if provided
-        if args.pdf_files:
-            logger.info(f"Loading custom PDF files: {args.pdf_files}")
-            await loader.load_pdfs(args.pdf_files)
+        if pdf_files:
+            logger.info(f"Loading {len(pdf_files)} custom PDF files")
+            await loader.load_pdfs(pdf_files)
         else:
             # Load default PDFs
             logger.info("Loading default PDF files from project root...")
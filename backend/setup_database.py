@@ -28,21 +28,15 @@ def setup_database():
         # Create engine
         engine = create_engine(database_url)
         
-        # Test connection
-        with engine.connect() as conn:
+        # Run extension, table and index DDL in a single transaction
+        with engine.begin() as conn:
             print(f"✅ Connected to PostgreSQL at {host}:{port}")
             
-            # Enable pgvector extension
-            print("📦 Enabling pgvector extension...")
-            conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
-            conn.commit()
-            print("✅ pgvector extension enabled")
-            
-            # Create tables
-            print("🏗️  Creating database tables...")
-            from app.models.database import Base
-            Base.metadata.create_all(bind=engine)
-            print("✅ Database tables created")
+            # Enable pgvector extension and create tables/indexes on the same connection
+            print("🏗️  Enabling pgvector and creating database tables...")
+            from app.models.database import create_schema
+            create_schema(conn)
+            print("✅ pgvector extension enabled and database tables created")
             
             # Verify setup
             result = conn.execute(text("SELECT version()"))
@@ -14,6 +14,7 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from vector_service_gemini import GeminiVectorService
+from app.utils.pdf_discovery import discover_pdfs
 
 class GeminiServiceTester:
     """Test class for Gemini Vector Service"""
@@ -48,20 +49,11 @@ class GeminiServiceTester:
         
         project_root = Path(__file__).parent.parent
         
-        # Common locations for PDF files
-        potential_files = [
-            project_root / "Instructions.pdf",
-            project_root / "Rules.pdf",
-            project_root / "data" / "sample.pdf",
-            project_root / "TestData" / "sample.pdf",
-            project_root / "backend" / "data" / "sample.pdf"
-        ]
-        
+        # Search common locations for PDF files
         self.test_files = []
-        for file_path in potential_files:
-            if file_path.exists():
-                self.test_files.append(str(file_path))
-                print(f"   ✅ Found: {file_path.name}")
+        for file_path in discover_pdfs(project_root):
+            self.test_files.append(str(file_path))
+            print(f"   ✅ Found: {file_path.name}")
         
         if not self.test_files:
             print("   ⚠️  No PDF files found for testing")
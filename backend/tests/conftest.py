@@ -6,21 +6,28 @@ import asyncio
 import os
 import tempfile
 import shutil
+from dataclasses import dataclass
 from pathlib import Path
-from typing import AsyncGenerator, Generator
-from unittest.mock import AsyncMock, MagicMock
+from typing import AsyncGenerator, Generator, List
+from unittest.mock import AsyncMock, patch
 
 import httpx
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
+from pydantic import TypeAdapter
+
+try:
+    import uvloop
+except ImportError:  # Optional: not available on Windows
+    uvloop = None
 
 # Add backend to path
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.main import app
+from app.main import app, get_rag_service, get_vector_service
 from app.services.vector_service import PostgreSQLVectorService
 from app.services.rag_service import RAGService
 from app.models.schemas import ComplianceQuery, ComplianceResponse
@@ -28,10 +35,16 @@ from app.models.schemas import ComplianceQuery, ComplianceResponse
 # Test configuration
 TEST_DATABASE_URL = "sqlite:///:memory:"
 
+# Snapshot of the app's dependency overrides, restored after every test
+_ORIG_OVERRIDES = app.dependency_overrides.copy()
+
+# Batch validator for lists of queries (schema is resolved once)
+_COMPLIANCE_QUERY_LIST = TypeAdapter(List[ComplianceQuery])
+
 @pytest.fixture(scope="session")
 def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
+    """Create one event loop for the test session (uvloop when installed)."""
+    loop = uvloop.new_event_loop() if uvloop else asyncio.get_event_loop_policy().new_event_loop()
     yield loop
     loop.close()
 
@@ -56,20 +69,27 @@ def test_db_session(test_db_engine):
     yield session
     session.close()
 
-@pytest.fixture
-async def mock_vector_service():
-    """Mock vector service for testing."""
+@dataclass(frozen=True, slots=True)
+class _MockStatus:
+    """Document status returned by the mocked vector service."""
+    total_documents: int
+    total_chunks: int
+    documents: list
+
+@pytest.fixture(scope="session")
+def mock_vector_service():
+    """Mock vector service for testing (built once; spec introspection is slow)."""
     mock_service = AsyncMock(spec=PostgreSQLVectorService)
     
     # Mock document status
-    mock_status = MagicMock()
-    mock_status.total_documents = 2
-    mock_status.total_chunks = 150
-    mock_status.documents = [
-        {"name": "Instructions.pdf", "chunks": 75, "status": "loaded"},
-        {"name": "Rules.pdf", "chunks": 75, "status": "loaded"}
-    ]
-    mock_service.get_document_status.return_value = mock_status
+    mock_service.get_document_status.return_value = _MockStatus(
+        total_documents=2,
+        total_chunks=150,
+        documents=[
+            {"name": "Instructions.pdf", "chunks": 75, "status": "loaded"},
+            {"name": "Rules.pdf", "chunks": 75, "status": "loaded"}
+        ]
+    )
     
     # Mock reload documents
     mock_service.reload_documents.return_value = None
@@ -82,34 +102,69 @@ async def mock_vector_service():
     
     return mock_service
 
-@pytest.fixture
-async def mock_rag_service(mock_vector_service):
-    """Mock RAG service for testing."""
+@pytest.fixture(scope="session")
+def mock_rag_service(mock_vector_service):
+    """Mock RAG service for testing (built once; spec introspection is slow)."""
     mock_service = AsyncMock(spec=RAGService)
     
     # Mock compliance check responses
     mock_response = ComplianceResponse(
         status="compliant",
-        confidence=0.85,
-        explanation="Based on regulatory guidelines, this appears to be compliant.",
-        relevant_sections=["Section 2.1", "Section 3.4"],
+        confidence_score=0.85,
+        summary="Based on regulatory guidelines, this appears to be compliant.",
+        reasoning="Data handling follows the relevant sections.",
+        impacted_rules=["Section 2.1", "Section 3.4"],
         recommendations=["Ensure proper documentation", "Maintain audit trail"]
     )
     mock_service.check_compliance.return_value = mock_response
     
     return mock_service
 
-@pytest.fixture
+@pytest.fixture(autouse=True)
+def reset_service_mocks(request):
+    """Reset call history and side effects on the session mocks after each test."""
+    yield
+    for name in ("mock_vector_service", "mock_rag_service"):
+        if name in request.fixturenames:
+            request.getfixturevalue(name).reset_mock(return_value=False, side_effect=True)
+
+@pytest.fixture(scope="session")
+def service_overrides(mock_vector_service, mock_rag_service):
+    """Dependency overrides serving the mocked services to every endpoint."""
+    return {
+        get_vector_service: lambda: mock_vector_service,
+        get_rag_service: lambda: mock_rag_service,
+    }
+
+def _mocked_app_services(mock_vector_service, mock_rag_service):
+    """Make the app lifespan build the mocked services instead of connecting to PostgreSQL."""
+    return (
+        patch("app.main.PostgreSQLVectorService", return_value=mock_vector_service),
+        patch("app.main.RAGService", return_value=mock_rag_service),
+    )
+
+@pytest.fixture(scope="session")
 def test_client(mock_vector_service, mock_rag_service):
-    """Create test client with mocked services."""
-    # Override the services in the app
-    app.dependency_overrides = {}
-    
-    # Create test client
-    with TestClient(app) as client:
+    """Create test client with mocked services (lifespan runs once per session)."""
+    vector_patch, rag_patch = _mocked_app_services(mock_vector_service, mock_rag_service)
+    with vector_patch, rag_patch, TestClient(app) as client:
         yield client
 
 @pytest.fixture
+def cold_test_client(mock_vector_service, mock_rag_service):
+    """Create a test client that runs startup/shutdown for this test only."""
+    vector_patch, rag_patch = _mocked_app_services(mock_vector_service, mock_rag_service)
+    with vector_patch, rag_patch, TestClient(app) as client:
+        yield client
+
+@pytest.fixture(autouse=True)
+def reset_dependency_overrides(service_overrides):
+    """Give each test its own copy of app.dependency_overrides and restore it afterwards."""
+    app.dependency_overrides = {**_ORIG_OVERRIDES, **service_overrides}
+    yield
+    app.dependency_overrides = _ORIG_OVERRIDES
+
+@pytest.fixture(scope="session")
 def sample_compliance_query():
     """Sample compliance query for testing."""
     return ComplianceQuery(
@@ -117,21 +172,28 @@ def sample_compliance_query():
         context="Processing customer data for financial services"
     )
 
+@pytest.fixture(scope="session")
+def sample_compliance_payload(sample_compliance_query):
+    """Sample compliance query serialized once as a JSON request body."""
+    return sample_compliance_query.model_dump_json().encode()
+
 @pytest.fixture
 def sample_compliance_response():
     """Sample compliance response for testing."""
     return ComplianceResponse(
         status="compliant",
-        confidence=0.85,
-        explanation="Based on regulatory guidelines, this appears to be compliant.",
-        relevant_sections=["Section 2.1", "Section 3.4"],
+        confidence_score=0.85,
+        summary="Based on regulatory guidelines, this appears to be compliant.",
+        reasoning="Data handling follows the relevant sections.",
+        impacted_rules=["Section 2.1", "Section 3.4"],
         recommendations=["Ensure proper documentation", "Maintain audit trail"]
     )
 
 @pytest.fixture
 def test_documents_dir():
     """Create temporary directory for test documents."""
-    temp_dir = tempfile.mkdtemp()
+    # Keep fixture I/O in RAM where a tmpfs is available (Linux)
+    temp_dir = tempfile.mkdtemp(dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
     
     # Create sample test documents
     instructions_content = """
@@ -233,13 +295,11 @@ def error_test_cases():
 @pytest.fixture
 def load_test_data():
     """Generate load test data."""
-    return [
-        ComplianceQuery(
-            concern=f"Test compliance concern {i}",
-            context=f"Test context {i}"
-        )
+    rows = [
+        {"concern": f"Test compliance concern {i}", "context": f"Test context {i}"}
         for i in range(100)
     ]
+    return _COMPLIANCE_QUERY_LIST.validate_python(rows)
 
 # Cleanup fixtures
 @pytest.fixture(autouse=True)
@@ -0,0 +1,59 @@
+"""
+Lightweight service stubs for RegReportRAG backend testing
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+class StubVectorService:
+    """Minimal async stand-in for PostgreSQLVectorService."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Clear configured results and errors."""
+        self.search_results: List[Dict[str, Any]] = []
+        self.general_results: List[Dict[str, Any]] = []
+        self.search_error: Optional[Exception] = None
+        self.document_status = None
+
+    async def hybrid_search(self, query: str, n_results: int = 20,
+                            include_types: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        if self.search_error:
+            raise self.search_error
+        return list(self.search_results)
+
+    async def search_similar_documents(self, query: str, n_results: int = 20,
+                                       filter_metadata: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        if self.search_error:
+            raise self.search_error
+        return list(self.general_results)
+
+    async def initialize_database(self):
+        pass
+
+    async def get_document_status(self):
+        return self.document_status
+
+    async def reload_documents(self):
+        pass
+
+    async def close(self):
+        pass
+
+class FakeResult:
+    """Precomputed query result."""
+
+    def __init__(self, rows: Sequence[tuple]):
+        self._rows = rows
+
+    def fetchall(self) -> List[tuple]:
+        return list(self._rows)
+
+class FakeSession:
+    """In-memory stand-in for a SQLAlchemy Session that answers every query with the same rows."""
+
+    def __init__(self, rows: Sequence[tuple] = ()):
+        self.rows = list(rows)
+
+    def execute(self, statement, params: Optional[Dict[str, Any]] = None) -> FakeResult:
+        return FakeResult(self.rows)
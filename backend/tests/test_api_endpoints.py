@@ -3,12 +3,26 @@ API endpoint tests for RegReportRAG backend
 """
 import pytest
 import json
+import asyncio
 from fastapi.testclient import TestClient
-from unittest.mock import patch, AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
-from app.main import app
+from app.main import app, get_rag_service
 from app.models.schemas import ComplianceQuery, ComplianceResponse
 
+# Request headers for pre-serialized JSON bodies
+JSON_HEADERS = {"content-type": "application/json"}
+
+# Canned service response shared by the compliance endpoint tests
+_CANNED_RESP = ComplianceResponse(
+    status="compliant",
+    confidence_score=0.85,
+    summary="Test summary",
+    reasoning="Test explanation",
+    impacted_rules=["Section 1"],
+    recommendations=["Test recommendation"]
+)
+
 class TestRootEndpoint:
     """Test root endpoint functionality."""
     
@@ -31,32 +45,31 @@ class TestHealthEndpoint:
         assert data["status"] == "healthy"
         assert "vector_db" in data
 
+@pytest.mark.xdist_group("mock_services")
 class TestComplianceCheckEndpoint:
     """Test compliance check endpoint functionality."""
     
-    def test_compliance_check_success(self, test_client, sample_compliance_query):
+    @pytest.fixture(autouse=True)
+    def mock_check_compliance(self, test_client):
+        """Serve the canned response from the RAG service dependency for every test."""
+        mock_check = AsyncMock(return_value=_CANNED_RESP)
+        app.dependency_overrides[get_rag_service] = lambda: MagicMock(check_compliance=mock_check)
+        return mock_check
+    
+    def test_compliance_check_success(self, test_client, sample_compliance_payload):
         """Test successful compliance check."""
-        with patch('app.main.rag_service') as mock_rag:
-            mock_rag.check_compliance.return_value = ComplianceResponse(
-                status="compliant",
-                confidence=0.85,
-                explanation="Test explanation",
-                relevant_sections=["Section 1"],
-                recommendations=["Test recommendation"]
-            )
-            
-            response = test_client.post(
-                "/api/v1/compliance/check",
-                json=sample_compliance_query.dict()
-            )
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "compliant"
-            assert data["confidence"] == 0.85
-            assert "explanation" in data
-            assert "relevant_sections" in data
-            assert "recommendations" in data
+        response = test_client.post(
+            "/api/v1/compliance/check",
+            content=sample_compliance_payload, headers=JSON_HEADERS
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "compliant"
+        assert data["confidence_score"] == 0.85
+        assert "summary" in data
+        assert "relevant_documents" in data
+        assert "recommendations" in data
     
     def test_compliance_check_invalid_input(self, test_client):
         """Test compliance check with invalid input."""
@@ -86,19 +99,18 @@ class TestComplianceCheckEndpoint:
         
         assert response.status_code == 422  # Validation error
     
-    def test_compliance_check_service_error(self, test_client, sample_compliance_query):
+    def test_compliance_check_service_error(self, test_client, sample_compliance_payload, mock_check_compliance):
         """Test compliance check when service throws error."""
-        with patch('app.main.rag_service') as mock_rag:
-            mock_rag.check_compliance.side_effect = Exception("Service error")
-            
-            response = test_client.post(
-                "/api/v1/compliance/check",
-                json=sample_compliance_query.dict()
-            )
-            
-            assert response.status_code == 500
-            data = response.json()
-            assert "detail" in data
+        mock_check_compliance.side_effect = Exception("Service error")
+        
+        response = test_client.post(
+            "/api/v1/compliance/check",
+            content=sample_compliance_payload, headers=JSON_HEADERS
+        )
+        
+        assert response.status_code == 500
+        data = response.json()
+        assert "detail" in data
     
     @pytest.mark.parametrize("test_case", [
         {
@@ -119,88 +131,67 @@ class TestComplianceCheckEndpoint:
     ])
     def test_compliance_check_various_scenarios(self, test_client, test_case):
         """Test compliance check with various scenarios."""
-        with patch('app.main.rag_service') as mock_rag:
-            mock_rag.check_compliance.return_value = ComplianceResponse(
-                status=test_case["expected_status"],
-                confidence=0.85,
-                explanation="Test explanation",
-                relevant_sections=["Section 1"],
-                recommendations=["Test recommendation"]
-            )
-            
-            query_data = {
-                "concern": test_case["concern"],
-                "context": test_case["context"]
-            }
-            
-            response = test_client.post(
-                "/api/v1/compliance/check",
-                json=query_data
-            )
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == test_case["expected_status"]
+        query_data = {
+            "concern": test_case["concern"],
+            "context": test_case["context"]
+        }
+        
+        response = test_client.post(
+            "/api/v1/compliance/check",
+            json=query_data
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == test_case["expected_status"]
 
+@pytest.mark.xdist_group("mock_services")
 class TestDocumentStatusEndpoint:
     """Test document status endpoint functionality."""
     
-    def test_document_status_success(self, test_client):
+    def test_document_status_success(self, test_client, mock_vector_service):
         """Test successful document status retrieval."""
-        with patch('app.main.vector_service') as mock_vector:
-            mock_status = {
-                "total_documents": 2,
-                "total_chunks": 150,
-                "documents": [
-                    {"name": "Instructions.pdf", "chunks": 75, "status": "loaded"},
-                    {"name": "Rules.pdf", "chunks": 75, "status": "loaded"}
-                ]
-            }
-            mock_vector.get_document_status.return_value = mock_status
-            
-            response = test_client.get("/api/v1/documents/status")
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["total_documents"] == 2
-            assert data["total_chunks"] == 150
-            assert len(data["documents"]) == 2
+        response = test_client.get("/api/v1/documents/status")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_documents"] == 2
+        assert data["total_chunks"] == 150
+        assert len(data["documents"]) == 2
+        mock_vector_service.get_document_status.assert_awaited_once()
     
-    def test_document_status_service_error(self, test_client):
+    def test_document_status_service_error(self, test_client, mock_vector_service):
         """Test document status when service throws error."""
-        with patch('app.main.vector_service') as mock_vector:
-            mock_vector.get_document_status.side_effect = Exception("Service error")
-            
-            response = test_client.get("/api/v1/documents/status")
-            
-            assert response.status_code == 500
-            data = response.json()
-            assert "detail" in data
+        mock_vector_service.get_document_status.side_effect = Exception("Service error")
+        
+        response = test_client.get("/api/v1/documents/status")
+        
+        assert response.status_code == 500
+        data = response.json()
+        assert "detail" in data
 
+@pytest.mark.xdist_group("mock_services")
 class TestDocumentReloadEndpoint:
     """Test document reload endpoint functionality."""
     
-    def test_document_reload_success(self, test_client):
+    def test_document_reload_success(self, test_client, mock_vector_service):
         """Test successful document reload."""
-        with patch('app.main.vector_service') as mock_vector:
-            mock_vector.reload_documents.return_value = None
-            
-            response = test_client.post("/api/v1/documents/reload")
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["message"] == "Documents reloaded successfully"
+        response = test_client.post("/api/v1/documents/reload")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["message"] == "Documents reloaded successfully"
+        mock_vector_service.reload_documents.assert_awaited_once()
     
-    def test_document_reload_service_error(self, test_client):
+    def test_document_reload_service_error(self, test_client, mock_vector_service):
         """Test document reload when service throws error."""
-        with patch('app.main.vector_service') as mock_vector:
-            mock_vector.reload_documents.side_effect = Exception("Service error")
-            
-            response = test_client.post("/api/v1/documents/reload")
-            
-            assert response.status_code == 500
-            data = response.json()
-            assert "detail" in data
+        mock_vector_service.reload_documents.side_effect = Exception("Service error")
+        
+        response = test_client.post("/api/v1/documents/reload")
+        
+        assert response.status_code == 500
+        data = response.json()
+        assert "detail" in data
 
 class TestErrorHandling:
     """Test error handling across endpoints."""
@@ -233,71 +224,42 @@ class TestCORSConfiguration:
         assert response.status_code == 200
         # CORS headers should be present (handled by FastAPI middleware)
 
+@pytest.mark.xdist_group("mock_services")
 class TestPerformance:
     """Test API performance characteristics."""
     
-    def test_compliance_check_response_time(self, test_client, sample_compliance_query):
+    def test_compliance_check_response_time(self, test_client, sample_compliance_payload):
         """Test compliance check response time."""
         import time
         
-        with patch('app.main.rag_service') as mock_rag:
-            mock_rag.check_compliance.return_value = ComplianceResponse(
-                status="compliant",
-                confidence=0.85,
-                explanation="Test explanation",
-                relevant_sections=["Section 1"],
-                recommendations=["Test recommendation"]
-            )
-            
-            start_time = time.time()
-            response = test_client.post(
-                "/api/v1/compliance/check",
-                json=sample_compliance_query.dict()
-            )
-            end_time = time.time()
-            
-            assert response.status_code == 200
-            assert (end_time - start_time) < 5.0  # Should respond within 5 seconds
-    
-    def test_concurrent_requests(self, test_client, sample_compliance_query):
-        """Test handling of concurrent requests."""
-        import threading
-        import time
-        
-        results = []
-        errors = []
+        app.dependency_overrides[get_rag_service] = lambda: MagicMock(
+            check_compliance=AsyncMock(return_value=_CANNED_RESP)
+        )
         
-        def make_request():
-            try:
-                with patch('app.main.rag_service') as mock_rag:
-                    mock_rag.check_compliance.return_value = ComplianceResponse(
-                        status="compliant",
-                        confidence=0.85,
-                        explanation="Test explanation",
-                        relevant_sections=["Section 1"],
-                        recommendations=["Test recommendation"]
-                    )
-                    
-                    response = test_client.post(
-                        "/api/v1/compliance/check",
-                        json=sample_compliance_query.dict()
-                    )
-                    results.append(response.status_code)
-            except Exception as e:
-                errors.append(str(e))
+        start_time = time.time()
+        response = test_client.post(
+            "/api/v1/compliance/check",
+            content=sample_compliance_payload, headers=JSON_HEADERS
+        )
+        end_time = time.time()
         
-        # Start 10 concurrent requests
-        threads = []
-        for _ in range(10):
-            thread = threading.Thread(target=make_request)
-            threads.append(thread)
-            thread.start()
+        assert response.status_code == 200
+        assert (end_time - start_time) < 5.0  # Should respond within 5 seconds
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_requests(self, async_client, sample_compliance_payload):
+        """Test handling of concurrent requests."""
+        app.dependency_overrides[get_rag_service] = lambda: MagicMock(
+            check_compliance=AsyncMock(return_value=_CANNED_RESP)
+        )
         
-        # Wait for all threads to complete
-        for thread in threads:
-            thread.join()
+        # Issue 10 concurrent requests on one event loop
+        async with async_client as client:
+            responses = await asyncio.gather(*(
+                client.post("/api/v1/compliance/check", content=sample_compliance_payload, headers=JSON_HEADERS)
+                for _ in range(10)
+            ))
         
         # All requests should succeed
-        assert len(errors) == 0
-        assert len(results) == 10
-        assert all(status == 200 for status in results) 
\ No newline at end of file
+        assert len(responses) == 10
+        assert all(response.status_code == 200 for response in responses)
@@ -1,149 +1,244 @@
 """
 Service layer tests for RegReportRAG backend
+
+Test classes are tagged with xdist groups so they spread across workers:
+    pytest tests/test_services.py -n auto --dist loadgroup
 """
+import os
 import pytest
 import asyncio
+import json
+from functools import lru_cache
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
-from typing import List
+from typing import List, Optional
+from sqlalchemy.orm import Session
 
 from app.services.rag_service import RAGService
 from app.services.vector_service import PostgreSQLVectorService
 from app.models.schemas import ComplianceQuery, ComplianceResponse
+from tests.stubs import FakeSession, StubVectorService
+
+def openai_response(content: Optional[str] = None, arguments: Optional[str] = None):
+    """Build a chat completion response (function call arguments or plain content)."""
+    function_call = SimpleNamespace(arguments=arguments) if arguments is not None else None
+    message = SimpleNamespace(content=content, function_call=function_call)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+def compliance_arguments(status: str) -> str:
+    """Function call arguments for a compliance assessment with the given status."""
+    # Compact separators, matching what the API returns
+    return json.dumps({
+        "status": status,
+        "confidence_score": 0.85,
+        "summary": "Test summary",
+        "impacted_rules": ["2.1", "1.3"],
+        "reasoning": "Test explanation",
+        "compliance_details": [],
+        "recommendations": ["Implement encryption", "Set up access controls"]
+    }, separators=(",", ":"))
+
+# Validated queries shared by tests (treat as read-only)
+_QUERIES = {
+    "privacy": ComplianceQuery(
+        concern="Data privacy compliance for customer information",
+        context="Processing customer data for financial services"
+    ),
+    "unrelated": ComplianceQuery(
+        concern="Unrelated topic",
+        context="No relevant context"
+    ),
+}
+
+# Function call arguments, serialized once at import and keyed by status
+_COMPLIANCE_ARGUMENTS = {
+    status: compliance_arguments(status)
+    for status in ("compliant", "non_compliant", "requires_review")
+}
+
+# Mock search result shapes shared by tests (copy before handing to a service)
+_SEARCH_RESULTS = {
+    "empty": (),
+    "privacy": (
+        {
+            "content": "Data privacy requirements mandate encryption",
+            "metadata": {"document_name": "Instructions.pdf", "page_number": 2},
+            "similarity_score": 0.95
+        },
+        {
+            "content": "Access controls must be implemented",
+            "metadata": {"document_name": "Rules.pdf", "page_number": 1},
+            "similarity_score": 0.88
+        },
+    ),
+    "test": (
+        {
+            "content": "Test content",
+            "metadata": {"document_name": "Instructions.pdf", "page_number": 1},
+            "similarity_score": 0.8
+        },
+    ),
+}
+
+@lru_cache(maxsize=None)
+def scenario_search_results(concern: str) -> tuple:
+    """Mock search results for a scenario concern (none for unrelated topics)."""
+    if "unrelated" in concern.lower():
+        return ()
+    return (
+        {
+            "content": f"Relevant content for {concern}",
+            "metadata": {"document_name": "Instructions.pdf", "page_number": 1},
+            "similarity_score": 0.9
+        },
+    )
+
+def _fail_vector_search(vector_service, openai_mock):
+    """Vector search fails; the LLM still answers without retrieved context."""
+    vector_service.search_error = Exception("Vector search failed")
+    openai_mock.return_value = openai_response(arguments=_COMPLIANCE_ARGUMENTS["compliant"])
+
+def _fail_openai(vector_service, openai_mock):
+    """OpenAI API call fails."""
+    openai_mock.side_effect = Exception("OpenAI API error")
+
+def _return_invalid_openai_response(vector_service, openai_mock):
+    """OpenAI returns no function call and unparseable content."""
+    openai_mock.return_value = openai_response(content="Invalid JSON response")
+
+def build_patched_vector_service(db=None):
+    """Construct a PostgreSQLVectorService with the database and OpenAI patched out."""
+    if db is None:
+        # spec_set makes a misspelled Session attribute fail at test time
+        db = MagicMock(spec_set=Session)
+    session_factory = MagicMock()
+    session_factory.configure_mock(**{"return_value.__enter__.return_value": db})
+    engine = MagicMock()
+    with patch('app.services.vector_service.create_session_factory', return_value=(session_factory, engine)), \
+         patch('app.services.vector_service.OpenAI'), \
+         patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+        service = PostgreSQLVectorService()
+    return service, db, engine
+
+async def initialize_patched_vector_service(service: PostgreSQLVectorService):
+    """Run initialize_database without touching the database or the PDFs on disk."""
+    with patch('app.services.vector_service.init_database'), \
+         patch.object(service, '_process_initial_documents', AsyncMock()):
+        await service.initialize_database()
 
+@pytest.fixture(scope="session")
+def shared_vector_service_stub():
+    """Vector service stub shared by the RAG service tests."""
+    return StubVectorService()
+
+@pytest.fixture
+def stub_vector_service(shared_vector_service_stub):
+    """Shared vector service stub, reset after each test."""
+    yield shared_vector_service_stub
+    shared_vector_service_stub.reset()
+
+@pytest.fixture(scope="session")
+def openai_client_mock():
+    """Mock OpenAI client, passed to each RAGService in this module."""
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock()
+    return client
+
+@pytest.fixture
+def openai_mock(openai_client_mock):
+    """Chat completion mock, reset after each test."""
+    create = openai_client_mock.chat.completions.create
+    yield create
+    create.reset_mock(return_value=True, side_effect=True)
+
+@pytest.fixture
+def empty_search_results(stub_vector_service, openai_mock):
+    """No relevant chunks; the LLM answers without regulatory context."""
+    stub_vector_service.search_results = list(_SEARCH_RESULTS["empty"])
+    openai_mock.return_value = openai_response(content="No relevant regulatory content was provided.")
+    return stub_vector_service
+
+@pytest.fixture(scope="session")
+async def full_stack(openai_client_mock):
+    """Vector service over an in-memory session and a RAG service on top of it, initialized once per session."""
+    service, db, engine = build_patched_vector_service(FakeSession())
+    await initialize_patched_vector_service(service)
+    with patch.object(service, '_generate_embeddings', AsyncMock(return_value=[[0.1] * 1536])):
+        yield service, RAGService(service, openai_client=openai_client_mock), db, engine
+    await service.close()
+
+@pytest.fixture(scope="session")
+def rag_service(shared_vector_service_stub, openai_client_mock):
+    """Create RAG service with mocked dependencies."""
+    return RAGService(shared_vector_service_stub, openai_client=openai_client_mock)
+
+@pytest.mark.xdist_group(name="rag")
 class TestRAGService:
     """Test RAG service functionality."""
     
-    @pytest.fixture
-    def mock_vector_service(self):
-        """Create mock vector service."""
-        mock_service = AsyncMock(spec=PostgreSQLVectorService)
-        return mock_service
-    
-    @pytest.fixture
-    def rag_service(self, mock_vector_service):
-        """Create RAG service with mocked dependencies."""
-        return RAGService(mock_vector_service)
-    
     @pytest.mark.asyncio
-    async def test_check_compliance_success(self, rag_service, mock_vector_service):
+    async def test_check_compliance_success(self, rag_service, stub_vector_service, openai_mock):
         """Test successful compliance check."""
         # Mock vector search results
-        mock_search_results = [
-            {
-                "content": "Data privacy requirements mandate encryption",
-                "metadata": {"source": "Instructions.pdf", "section": "2.1"},
-                "score": 0.95
-            },
-            {
-                "content": "Access controls must be implemented",
-                "metadata": {"source": "Rules.pdf", "section": "1.3"},
-                "score": 0.88
-            }
-        ]
-        mock_vector_service.search_similar_chunks.return_value = mock_search_results
+        stub_vector_service.search_results = list(_SEARCH_RESULTS["privacy"])
         
         # Mock OpenAI response
-        with patch('app.services.rag_service.openai.ChatCompletion.create') as mock_openai:
-            mock_openai.return_value = MagicMock(
-                choices=[MagicMock(
-                    message=MagicMock(
-                        content='{"status": "compliant", "confidence": 0.85, "explanation": "Test explanation", "relevant_sections": ["2.1", "1.3"], "recommendations": ["Implement encryption", "Set up access controls"]}'
-                    )
-                )]
-            )
-            
-            query = ComplianceQuery(
-                concern="Data privacy compliance for customer information",
-                context="Processing customer data for financial services"
-            )
-            
-            result = await rag_service.check_compliance(query.concern, query.context)
-            
-            assert isinstance(result, ComplianceResponse)
-            assert result.status == "compliant"
-            assert result.confidence == 0.85
-            assert "explanation" in result.explanation
-            assert len(result.relevant_sections) > 0
-            assert len(result.recommendations) > 0
-    
-    @pytest.mark.asyncio
-    async def test_check_compliance_no_relevant_chunks(self, rag_service, mock_vector_service):
-        """Test compliance check when no relevant chunks found."""
-        # Mock empty search results
-        mock_vector_service.search_similar_chunks.return_value = []
+        openai_mock.return_value = openai_response(arguments=_COMPLIANCE_ARGUMENTS["compliant"])
         
-        query = ComplianceQuery(
-            concern="Unrelated topic",
-            context="No relevant context"
-        )
+        query = _QUERIES["privacy"]
         
         result = await rag_service.check_compliance(query.concern, query.context)
         
         assert isinstance(result, ComplianceResponse)
-        assert result.status == "unknown"
-        assert result.confidence < 0.5
-    
+        assert result.status == "compliant"
+        assert result.confidence_score == 0.85
+        assert "explanation" in result.reasoning
+        assert len(result.relevant_documents) > 0
+        assert len(result.recommendations) > 0
+
     @pytest.mark.asyncio
-    async def test_check_compliance_openai_error(self, rag_service, mock_vector_service):
-        """Test compliance check when OpenAI API fails."""
-        # Mock search results
-        mock_search_results = [
-            {
-                "content": "Test content",
-                "metadata": {"source": "Instructions.pdf"},
-                "score": 0.8
-            }
-        ]
-        mock_vector_service.search_similar_chunks.return_value = mock_search_results
+    @pytest.mark.parametrize("status", list(_COMPLIANCE_ARGUMENTS))
+    async def test_check_compliance_status(self, rag_service, stub_vector_service, openai_mock, status):
+        """Test each assessed status is carried through to the response."""
+        stub_vector_service.search_results = list(_SEARCH_RESULTS["privacy"])
+        openai_mock.return_value = openai_response(arguments=_COMPLIANCE_ARGUMENTS[status])
         
-        # Mock OpenAI error
-        with patch('app.services.rag_service.openai.ChatCompletion.create') as mock_openai:
-            mock_openai.side_effect = Exception("OpenAI API error")
-            
-            query = ComplianceQuery(
-                concern="Test concern",
-                context="Test context"
-            )
-            
-            with pytest.raises(Exception):
-                await rag_service.check_compliance(query.concern, query.context)
+        result = await rag_service.check_compliance("Test concern", "Test context")
+        
+        assert result.status == status
+        assert result.impacted_rules == ["2.1", "1.3"]
+
+    @pytest.mark.asyncio
+    async def test_check_compliance_no_relevant_chunks(self, rag_service, empty_search_results):
+        """Test compliance check when no relevant chunks found."""
+        query = _QUERIES["unrelated"]
+        
+        result = await rag_service.check_compliance(query.concern, query.context)
+        
+        assert isinstance(result, ComplianceResponse)
+        assert result.status == "requires_review"
+        assert result.confidence_score <= 0.5
+        assert result.relevant_documents == []
     
     @pytest.mark.asyncio
-    async def test_check_compliance_invalid_openai_response(self, rag_service, mock_vector_service):
-        """Test compliance check with invalid OpenAI response."""
-        # Mock search results
-        mock_search_results = [
-            {
-                "content": "Test content",
-                "metadata": {"source": "Instructions.pdf"},
-                "score": 0.8
-            }
-        ]
-        mock_vector_service.search_similar_chunks.return_value = mock_search_results
+    @pytest.mark.parametrize("configure, expected_status", [
+        pytest.param(_fail_vector_search, "compliant", id="vector_error"),
+        pytest.param(_fail_openai, "requires_review", id="openai_error"),
+        pytest.param(_return_invalid_openai_response, "requires_review", id="invalid_openai_response"),
+    ])
+    async def test_check_compliance_error_handling(self, rag_service, stub_vector_service, openai_mock,
+                                                   configure, expected_status):
+        """Test compliance check degrades gracefully when a dependency fails."""
+        stub_vector_service.search_results = list(_SEARCH_RESULTS["test"])
+        configure(stub_vector_service, openai_mock)
         
-        # Mock invalid OpenAI response
-        with patch('app.services.rag_service.openai.ChatCompletion.create') as mock_openai:
-            mock_openai.return_value = MagicMock(
-                choices=[MagicMock(
-                    message=MagicMock(
-                        content="Invalid JSON response"
-                    )
-                )]
-            )
-            
-            query = ComplianceQuery(
-                concern="Test concern",
-                context="Test context"
-            )
-            
-            result = await rag_service.check_compliance(query.concern, query.context)
-            
-            # Should handle invalid response gracefully
-            assert isinstance(result, ComplianceResponse)
-            assert result.status == "unknown"
+        result = await rag_service.check_compliance("Test concern", "Test context")
+        
+        assert isinstance(result, ComplianceResponse)
+        assert result.status == expected_status
     
     @pytest.mark.asyncio
-    async def test_check_compliance_different_scenarios(self, rag_service, mock_vector_service):
+    async def test_check_compliance_different_scenarios(self):
         """Test compliance check with different scenarios."""
         test_cases = [
             {
@@ -156,222 +251,171 @@ class TestRAGService:
             },
             {
                 "concern": "Unrelated topic",
-                "expected_status": "unknown"
+                "expected_status": "requires_review"
             }
         ]
         
-        for test_case in test_cases:
-            # Mock search results based on scenario
-            if "unrelated" in test_case["concern"].lower():
-                mock_search_results = []
-            else:
-                mock_search_results = [
-                    {
-                        "content": f"Relevant content for {test_case['concern']}",
-                        "metadata": {"source": "Instructions.pdf"},
-                        "score": 0.9
-                    }
-                ]
+        async def run_case(test_case):
+            # Each case gets its own services, so cases can run concurrently
+            vector_service = StubVectorService()
+            vector_service.search_results = list(scenario_search_results(test_case["concern"]))
             
-            mock_vector_service.search_similar_chunks.return_value = mock_search_results
+            # Mock OpenAI function call response
+            openai_client = MagicMock()
+            openai_client.chat.completions.create = AsyncMock(return_value=openai_response(
+                arguments=_COMPLIANCE_ARGUMENTS[test_case["expected_status"]]
+            ))
             
-            # Mock OpenAI response
-            with patch('app.services.rag_service.openai.ChatCompletion.create') as mock_openai:
-                mock_openai.return_value = MagicMock(
-                    choices=[MagicMock(
-                        message=MagicMock(
-                            content=f'{{"status": "{test_case["expected_status"]}", "confidence": 0.85, "explanation": "Test", "relevant_sections": ["1.1"], "recommendations": ["Test"]}}'
-                        )
-                    )]
-                )
-                
-                result = await rag_service.check_compliance(
-                    test_case["concern"], 
-                    "Test context"
-                )
-                
-                assert isinstance(result, ComplianceResponse)
-                assert result.status == test_case["expected_status"]
+            rag_service = RAGService(vector_service, openai_client=openai_client)
+            return await rag_service.check_compliance(test_case["concern"], "Test context")
+        
+        results = await asyncio.gather(*(run_case(test_case) for test_case in test_cases))
+        
+        for test_case, result in zip(test_cases, results):
+            assert isinstance(result, ComplianceResponse)
+            assert result.status == test_case["expected_status"]
 
+@pytest.mark.xdist_group(name="vector")
 class TestVectorService:
     """Test vector service functionality."""
     
+    @pytest.fixture(scope="class")
+    async def patched_vector_service(self):
+        """One initialized PostgreSQLVectorService per class, closed on teardown."""
+        service, db, engine = build_patched_vector_service()
+        await initialize_patched_vector_service(service)
+        yield service, db, engine
+        await service.close()
+    
     @pytest.fixture
-    def mock_chroma_client(self):
-        """Create mock ChromaDB client."""
-        mock_client = MagicMock()
-        mock_collection = MagicMock()
-        mock_client.get_or_create_collection.return_value = mock_collection
-        return mock_client, mock_collection
+    def vector_service(self, patched_vector_service):
+        """Shared vector service, with its database mocks reset after each test."""
+        yield patched_vector_service
+        service, db, engine = patched_vector_service
+        db.reset_mock(return_value=True, side_effect=True)
+        # Keep return values: resetting them would also wipe the engine's __bool__
+        engine.reset_mock(return_value=False, side_effect=True)
+        service.document_status = {}
     
     @pytest.mark.asyncio
-    async def test_initialize_database(self, mock_chroma_client):
+    async def test_initialize_database(self, vector_service):
         """Test database initialization."""
-        mock_client, mock_collection = mock_chroma_client
+        service, db, engine = vector_service
         
-        with patch('app.services.vector_service.chromadb.PersistentClient', return_value=mock_client):
-            service = PostgreSQLVectorService()
+        with patch('app.services.vector_service.init_database') as mock_init, \
+             patch.object(service, '_process_initial_documents', AsyncMock()):
             await service.initialize_database()
             
-            mock_client.get_or_create_collection.assert_called_once()
+            mock_init.assert_called_once()
     
     @pytest.mark.asyncio
-    async def test_search_similar_chunks(self, mock_chroma_client):
-        """Test searching for similar chunks."""
-        mock_client, mock_collection = mock_chroma_client
+    async def test_search_similar_documents(self, vector_service):
+        """Test searching for similar documents."""
+        service, db, engine = vector_service
         
-        # Mock search results
-        mock_results = {
-            "documents": [["Test document content"]],
-            "metadatas": [[{"source": "Instructions.pdf", "section": "1.1"}]],
-            "distances": [[0.1]]
-        }
-        mock_collection.query.return_value = mock_results
+        # Mock query rows: content, metadata, chunk_type, document_name, page_number, similarity
+        db.configure_mock(**{"execute.return_value.fetchall.return_value": [
+            ("Test document content", '{"section": "1.1"}', "general", "Instructions.pdf", 1, 0.9)
+        ]})
         
-        with patch('app.services.vector_service.chromadb.PersistentClient', return_value=mock_client):
-            service = PostgreSQLVectorService()
-            
-            results = await service.search_similar_chunks("test query", limit=5)
-            
-            assert len(results) > 0
-            assert "content" in results[0]
-            assert "metadata" in results[0]
-            assert "score" in results[0]
+        with patch.object(service, '_generate_embeddings', AsyncMock(return_value=[[0.1] * 1536])):
+            results = await service.search_similar_documents("test query", n_results=5)
+        
+        assert len(results) > 0
+        assert "content" in results[0]
+        assert "metadata" in results[0]
+        assert "similarity_score" in results[0]
     
     @pytest.mark.asyncio
-    async def test_get_document_status(self, mock_chroma_client):
+    async def test_get_document_status(self, vector_service):
         """Test getting document status."""
-        mock_client, mock_collection = mock_chroma_client
+        service, db, engine = vector_service
         
-        # Mock collection count
-        mock_collection.count.return_value = 150
+        db.configure_mock(**{
+            "query.return_value.count.return_value": 150,
+            "query.return_value.distinct.return_value.count.return_value": 2,
+            "query.return_value.distinct.return_value.__iter__.return_value": [("Instructions.pdf",), ("Rules.pdf",)],
+            "query.return_value.filter.return_value.count.return_value": 75,
+            "query.return_value.filter.return_value.order_by.return_value.first.return_value": None,
+        })
         
-        # Mock get results
-        mock_get_results = {
-            "metadatas": [
-                [{"source": "Instructions.pdf", "section": "1.1"}],
-                [{"source": "Rules.pdf", "section": "2.1"}]
-            ]
-        }
-        mock_collection.get.return_value = mock_get_results
+        status = await service.get_document_status()
         
-        with patch('app.services.vector_service.chromadb.PersistentClient', return_value=mock_client):
-            service = PostgreSQLVectorService()
-            
-            status = await service.get_document_status()
-            
-            assert status.total_documents == 2
-            assert status.total_chunks == 150
-            assert len(status.documents) == 2
+        assert status.total_documents == 2
+        assert status.total_chunks == 150
+        assert len(status.documents) == 2
     
     @pytest.mark.asyncio
-    async def test_reload_documents(self, mock_chroma_client):
+    async def test_reload_documents(self, vector_service):
         """Test document reload functionality."""
-        mock_client, mock_collection = mock_chroma_client
+        service, db, engine = vector_service
         
-        with patch('app.services.vector_service.chromadb.PersistentClient', return_value=mock_client):
-            with patch('app.services.vector_service.PostgreSQLVectorService._load_documents') as mock_load:
-                service = PostgreSQLVectorService()
-                
-                await service.reload_documents()
-                
-                mock_load.assert_called_once()
+        with patch('app.services.vector_service.os.path.exists', return_value=True), \
+             patch.object(service, 'add_documents', AsyncMock()) as mock_add:
+            await service.reload_documents()
+            
+            mock_add.assert_awaited_once()
+        db.query.return_value.delete.assert_called_once()
     
     @pytest.mark.asyncio
-    async def test_close_connection(self, mock_chroma_client):
+    async def test_close_connection(self, vector_service):
         """Test closing database connection."""
-        mock_client, mock_collection = mock_chroma_client
+        service, db, engine = vector_service
         
-        with patch('app.services.vector_service.chromadb.PersistentClient', return_value=mock_client):
-            service = PostgreSQLVectorService()
-            
-            await service.close()
-            
-            # Should handle cleanup gracefully
-            assert True  # No exception should be raised
+        await service.close()
+        
+        engine.dispose.assert_called_once()
 
+@pytest.mark.xdist_group(name="integration")
 class TestServiceIntegration:
     """Test integration between services."""
     
+    @pytest.fixture
+    def stack(self, full_stack):
+        """Session full stack, with its stored rows cleared after each test."""
+        yield full_stack
+        service, rag_service, db, engine = full_stack
+        db.rows = []
+    
     @pytest.mark.asyncio
-    async def test_rag_vector_integration(self):
+    async def test_rag_vector_integration(self, stack, openai_mock):
         """Test integration between RAG and vector services."""
-        # Create real vector service with mocked ChromaDB
-        with patch('app.services.vector_service.chromadb.PersistentClient') as mock_chroma:
-            mock_client = MagicMock()
-            mock_collection = MagicMock()
-            mock_client.get_or_create_collection.return_value = mock_collection
-            mock_chroma.return_value = mock_client
-            
-            # Mock search results
-            mock_results = {
-                "documents": [["Test regulatory content"]],
-                "metadatas": [[{"source": "Instructions.pdf", "section": "1.1"}]],
-                "distances": [[0.1]]
-            }
-            mock_collection.query.return_value = mock_results
-            mock_collection.count.return_value = 100
-            
-            vector_service = PostgreSQLVectorService()
-            rag_service = RAGService(vector_service)
-            
-            # Test the integration
-            await vector_service.initialize_database()
-            
-            # Mock OpenAI for RAG service
-            with patch('app.services.rag_service.openai.ChatCompletion.create') as mock_openai:
-                mock_openai.return_value = MagicMock(
-                    choices=[MagicMock(
-                        message=MagicMock(
-                            content='{"status": "compliant", "confidence": 0.85, "explanation": "Test", "relevant_sections": ["1.1"], "recommendations": ["Test"]}'
-                        )
-                    )]
-                )
-                
-                result = await rag_service.check_compliance(
-                    "Data privacy compliance",
-                    "Customer data processing"
-                )
-                
-                assert isinstance(result, ComplianceResponse)
-                assert result.status == "compliant"
-            
-            await vector_service.close()
+        vector_service, rag_service, db, engine = stack
+        db.rows = [
+            ("Test regulatory content", '{"section": "1.1"}', "regulatory_rule", "Instructions.pdf", 1, 0.9)
+        ]
+        openai_mock.return_value = openai_response(arguments=_COMPLIANCE_ARGUMENTS["compliant"])
+        
+        # Test the integration
+        result = await rag_service.check_compliance(
+            "Data privacy compliance",
+            "Customer data processing"
+        )
+        
+        assert isinstance(result, ComplianceResponse)
+        assert result.status == "compliant"
+        assert len(result.relevant_documents) > 0
 
+@pytest.mark.xdist_group(name="errors")
 class TestErrorHandling:
     """Test error handling in services."""
     
     @pytest.mark.asyncio
     async def test_vector_service_connection_error(self):
         """Test vector service connection error handling."""
-        with patch('app.services.vector_service.chromadb.PersistentClient') as mock_chroma:
-            mock_chroma.side_effect = Exception("Connection failed")
-            
-            service = PostgreSQLVectorService()
+        with patch('app.services.vector_service.create_session_factory') as mock_factory:
+            mock_factory.side_effect = Exception("Connection failed")
             
-            with pytest.raises(Exception):
-                await service.initialize_database()
+            with pytest.raises(Exception, match="Connection failed"):
+                PostgreSQLVectorService()
     
     @pytest.mark.asyncio
-    async def test_rag_service_vector_error(self, mock_vector_service):
-        """Test RAG service handling vector service errors."""
-        mock_vector_service.search_similar_chunks.side_effect = Exception("Vector search failed")
-        
-        rag_service = RAGService(mock_vector_service)
-        
-        with pytest.raises(Exception):
-            await rag_service.check_compliance("test", "test")
-    
-    @pytest.mark.asyncio
-    async def test_service_graceful_degradation(self, mock_vector_service):
+    async def test_service_graceful_degradation(self, empty_search_results, openai_client_mock):
         """Test service graceful degradation."""
-        # Mock partial failure
-        mock_vector_service.search_similar_chunks.return_value = []
-        
-        rag_service = RAGService(mock_vector_service)
+        rag_service = RAGService(empty_search_results, openai_client=openai_client_mock)
         
         # Should handle empty results gracefully
         result = await rag_service.check_compliance("unrelated topic", "context")
         
         assert isinstance(result, ComplianceResponse)
-        assert result.status == "unknown" 
\ No newline at end of file
+        assert result.status == "requires_review" 
\ No newline at end of file
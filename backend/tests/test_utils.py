@@ -0,0 +1,87 @@
+"""
+Utility module tests for RegReportRAG backend
+"""
+
+from app.utils.pdf_discovery import discover_pdfs
+from app.utils.file_hash_cache import get_cached_file_hash, set_cached_file_hash
+from app.utils.embedding_cache import EmbeddingCache, embedding_cache_key
+
+class TestPDFDiscovery:
+    """Test PDF discovery helper."""
+
+    def test_discover_allow_listed_files_and_dirs(self, tmp_path):
+        """Test files and directories from the allow-list are discovered."""
+        (tmp_path / "Instructions.pdf").write_bytes(b"%PDF")
+        (tmp_path / "data" / "nested").mkdir(parents=True)
+        (tmp_path / "data" / "b.pdf").write_bytes(b"%PDF")
+        (tmp_path / "data" / "nested" / "a.pdf").write_bytes(b"%PDF")
+        (tmp_path / "data" / "notes.txt").write_text("not a pdf")
+
+        result = discover_pdfs(tmp_path, ("Instructions.pdf", "Rules.pdf", "data"))
+
+        assert result == [
+            tmp_path / "Instructions.pdf",
+            tmp_path / "data" / "b.pdf",
+            tmp_path / "data" / "nested" / "a.pdf",
+        ]
+
+    def test_discover_skips_missing_and_non_pdf(self, tmp_path):
+        """Test missing locations and non-PDF files are ignored."""
+        (tmp_path / "TestData").write_text("plain text")
+
+        assert discover_pdfs(tmp_path, ("Rules.pdf", "TestData")) == []
+
+    def test_discover_deduplicates(self, tmp_path):
+        """Test a PDF reachable from two locations is returned once."""
+        (tmp_path / "data").mkdir()
+        (tmp_path / "data" / "sample.pdf").write_bytes(b"%PDF")
+
+        result = discover_pdfs(tmp_path, ("data", "data/sample.pdf"))
+
+        assert result == [tmp_path / "data" / "sample.pdf"]
+
+class TestFileHashCache:
+    """Test xattr/sidecar file hash cache."""
+
+    def test_cached_hash_roundtrip(self, tmp_path):
+        """Test a recorded hash is returned while the file is unchanged."""
+        pdf = tmp_path / "Rules.pdf"
+        pdf.write_bytes(b"%PDF-1.4")
+
+        assert get_cached_file_hash(str(pdf)) is None
+        set_cached_file_hash(str(pdf), "abc123")
+        assert get_cached_file_hash(str(pdf)) == "abc123"
+
+    def test_cached_hash_invalidated_on_change(self, tmp_path):
+        """Test a recorded hash is ignored once the file changes."""
+        pdf = tmp_path / "Rules.pdf"
+        pdf.write_bytes(b"%PDF-1.4")
+        set_cached_file_hash(str(pdf), "abc123")
+
+        pdf.write_bytes(b"%PDF-1.4 modified")
+
+        assert get_cached_file_hash(str(pdf)) is None
+
+class TestEmbeddingCache:
+    """Test content-addressed embedding cache."""
+
+    def test_misses_computed_once(self, tmp_path):
+        """Test only unique missing texts are computed, and results stay aligned."""
+        cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+        calls = []
+
+        def compute(texts):
+            calls.append(texts)
+            return [[float(len(text)), 1.0] for text in texts]
+
+        result = cache.get_or_compute_many(["ab", "footer", "ab"], "model", compute)
+        again = cache.get_or_compute_many(["footer", "ab"], "model", compute)
+        cache.close()
+
+        assert calls == [["ab", "footer"]]
+        assert [list(v) for v in result] == [[2.0, 1.0], [6.0, 1.0], [2.0, 1.0]]
+        assert [list(v) for v in again] == [[6.0, 1.0], [2.0, 1.0]]
+
+    def test_key_depends_on_model(self):
+        """Test the same text embedded by different models gets different keys."""
+        assert embedding_cache_key("model-a", "text") != embedding_cache_key("model-b", "text")
@@ -1,18 +1,21 @@
 import os
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import logging
 import json
-import hashlib
+import multiprocessing
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
 import sys
 
 # Add the backend directory to the path so we can import from app
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import func, insert, text
 import numpy as np
 
 import google.generativeai as genai
@@ -21,12 +24,14 @@ from google.generativeai.types import HarmCategory, HarmBlockThreshold
 # Import from the existing app structure
 from app.models.schemas import DocumentStatus, DocumentsStatus
 from app.utils.logging_config import get_logger
+from app.utils.file_hash_cache import compute_file_hash
+from app.utils.embedding_cache import EmbeddingCache, embedding_cache_key
 
 # Import Gemini-specific database model
-from gemini_database import create_session_factory, GeminiDocumentChunk as DBDocumentChunk, init_gemini_database
+from gemini_database import create_session_factory, GeminiDocumentChunk as DBDocumentChunk, init_gemini_database, EMBEDDING_DIMENSIONS, search_chunks
 
 # Import the Gemini-specific document processor
-from gemini_document_processor import GeminiDocumentProcessor, DocumentChunk
+from gemini_document_processor import GeminiDocumentProcessor, DocumentChunk, init_worker_processor, extract_chunks
 
 # Configure logging
 logging.basicConfig(
@@ -39,6 +44,30 @@ logging.basicConfig(
 )
 logger = get_logger("gemini_vector_service")
 
+# Maximum number of texts sent in one embed_content request
+EMBEDDING_BATCH_SIZE = 100
+
+# Threads used for concurrent per-text embedding requests when batching is disabled
+EMBEDDING_THREADS = 32
+
+# Maximum number of files ingested concurrently (bounds parallel Gemini calls)
+MAX_CONCURRENT_FILES = 8
+
+# Recent query embeddings kept in memory (repeated RAG queries skip the embedding call)
+QUERY_EMBEDDING_CACHE_SIZE = 4096
+
+# SQLite file holding previously computed document embeddings (next to this module unless overridden)
+DEFAULT_EMBEDDING_CACHE_PATH = os.getenv(
+    "GEMINI_EMBEDDING_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "gemini_embedding_cache.sqlite3")
+)
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Unit-normalize each row in place so cosine similarity equals inner product"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    vectors /= np.maximum(norms, 1e-12)
+    return vectors
+
 class GeminiVectorService:
     """
     Standalone Vector Service using Google Gemini for embeddings and LLM processing
@@ -46,10 +75,17 @@ class GeminiVectorService:
     
     def __init__(self, 
                  embedding_model: str = "models/text-embedding-004",
-                 llm_model: str = "gemini-1.5-flash"):
+                 llm_model: str = "gemini-1.5-flash",
+                 embedding_cache_path: str = DEFAULT_EMBEDDING_CACHE_PATH,
+                 embedding_batch_size: int = EMBEDDING_BATCH_SIZE):
         
         self.embedding_model = embedding_model
         self.llm_model = llm_model
+        # Cache identity for embeddings: the same model truncated to another size gives different vectors
+        self._embedding_cache_model = f"{embedding_model}@{EMBEDDING_DIMENSIONS}"
+        # Set to 1 where list content is rejected or rate limits force per-text requests
+        self.embedding_batch_size = embedding_batch_size
+        self._embedding_executor = ThreadPoolExecutor(max_workers=EMBEDDING_THREADS)
         
         # Initialize Gemini API
         api_key = os.getenv("GOOGLE_API_KEY")
@@ -79,20 +115,28 @@ class GeminiVectorService:
             min_chunk_size=100    # Minimum chunk size
         )
         
+        # CPU-bound PDF parsing runs in worker processes so the event loop stays responsive
+        self._pdf_pool = self._create_pdf_pool()
+        
         # Track document processing status
         self.document_status = {}
         
+        # Bounds concurrent per-file processing in add_documents
+        self._ingest_semaphore = asyncio.Semaphore(MAX_CONCURRENT_FILES)
+        
+        # LRU of normalized query embeddings keyed by embedding_cache_key(model, query)
+        self._query_embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        
+        # Content-addressed cache so unchanged chunk text is not re-embedded
+        self.embedding_cache = EmbeddingCache(embedding_cache_path)
+        
         logger.info(f"Initialized Gemini Vector Service with embedding model: {embedding_model}")
         logger.info(f"Using LLM model: {llm_model}")
         logger.info(f"Chunking strategy: Character-based (no tiktoken) - max_size: {self.document_processor.max_chunk_size}, overlap: {self.document_processor.chunk_overlap}")
     
     def _get_file_hash(self, file_path: str) -> str:
-        """Compute MD5 hash of a file for change detection"""
-        hash_md5 = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+        """Compute SHA-256 hash of a file for change detection"""
+        return compute_file_hash(file_path)
     
     async def initialize_database(self):
         """Initialize PostgreSQL database with pgvector extension"""
@@ -105,21 +149,48 @@ class GeminiVectorService:
             logger.error(f"Error initializing PostgreSQL database: {str(e)}")
             raise
     
-    async def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings using Gemini API"""
-        try:
-            embeddings = []
-            for text in texts:
-                # Generate embedding for each text
-                result = genai.embed_content(
-                    model=self.embedding_model,
-                    content=text,
-                    task_type="retrieval_document"
-                )
-                embeddings.append(result['embedding'])
-            
+    def _embed_one(self, text: str) -> List[float]:
+        """Embed a single text with Gemini"""
+        return genai.embed_content(
+            model=self.embedding_model,
+            content=text,
+            task_type="retrieval_document",
+            output_dimensionality=EMBEDDING_DIMENSIONS
+        )['embedding']
+    
+    def _embed_batches(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts with Gemini, one request per batch of texts"""
+        if self.embedding_batch_size <= 1:
+            # No batching: overlap the per-text round trips on the thread pool (results stay in order)
+            embeddings = list(self._embedding_executor.map(self._embed_one, texts))
             logger.debug(f"Generated {len(embeddings)} embeddings using Gemini")
             return embeddings
+        
+        embeddings = []
+        for start in range(0, len(texts), self.embedding_batch_size):
+            # List content returns one embedding per text under 'embedding'
+            result = genai.embed_content(
+                model=self.embedding_model,
+                content=texts[start:start + self.embedding_batch_size],
+                task_type="retrieval_document",
+                output_dimensionality=EMBEDDING_DIMENSIONS
+            )
+            embeddings.extend(result['embedding'])
+        
+        logger.debug(f"Generated {len(embeddings)} embeddings using Gemini")
+        return embeddings
+    
+    async def _generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Generate a (len(texts), D) float32 embedding matrix, only calling Gemini for texts not already cached"""
+        try:
+            # Cache lookups and blocking Gemini calls run off the event loop
+            vectors = await asyncio.to_thread(
+                self.embedding_cache.get_or_compute_many, texts, self._embedding_cache_model, self._embed_batches
+            )
+            if not vectors:
+                return np.empty((0, 0), dtype=np.float32)
+            # Unit-normalize once so search can rank by inner product instead of cosine
+            return _normalize_rows(np.stack(vectors))
             
         except Exception as e:
             logger.error(f"Error generating Gemini embeddings: {str(e)}")
@@ -150,7 +221,7 @@ Please provide a comprehensive answer based on the context provided. If the cont
 ANSWER:"""
             
             # Generate response
-            response = self.llm.generate_content(prompt)
+            response = await asyncio.to_thread(self.llm.generate_content, prompt)
             
             logger.debug(f"Generated answer for query: {query}")
             return response.text
@@ -159,80 +230,118 @@ ANSWER:"""
             logger.error(f"Error generating answer with Gemini: {str(e)}")
             raise
     
+    def _create_pdf_pool(self) -> ProcessPoolExecutor:
+        """Worker processes for CPU-bound PDF parsing, each with its own document processor"""
+        # Spawned rather than forked, as this process already runs embedding/client threads
+        return ProcessPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker_processor,
+            initargs=(
+                self.document_processor.max_chunk_size,
+                self.document_processor.chunk_overlap,
+                self.document_processor.min_chunk_size
+            )
+        )
+    
+    async def _extract_chunks(self, file_path: str, compute_hash: bool) -> Tuple[Optional[str], List[DocumentChunk]]:
+        """Run extract_chunks in the process pool, replacing the pool if a worker died"""
+        pool = self._pdf_pool
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, extract_chunks, file_path, compute_hash)
+        except BrokenProcessPool:
+            # A dead worker breaks the whole pool: fail the files it held, but parse later files in a new one
+            if self._pdf_pool is pool:
+                logger.warning(f"PDF worker process died while parsing {file_path}; restarting the worker pool")
+                self._pdf_pool = self._create_pdf_pool()
+                pool.shutdown(wait=False)
+            raise
+    
+    async def _process_one(self, file_path: str, file_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Parse, embed and store a single PDF; returns None when it yields no chunks"""
+        async with self._ingest_semaphore:
+            self.document_status[file_path] = {
+                "status": "processing",
+                "last_updated": datetime.now(),
+                "chunk_count": 0
+            }
+            
+            # Process PDF
+            logger.info(f"Processing PDF: {file_path}")
+            # The worker hashes the bytes it parses (unless a hash was provided), so the file is read once
+            computed_hash, chunks = await self._extract_chunks(file_path, file_hash is None)
+            hash_to_use = file_hash or computed_hash
+            logger.info(f"Created {len(chunks)} chunks for {file_path}")
+            
+            if not chunks:
+                logger.warning(f"No chunks extracted from {file_path}")
+                return None
+            
+            # Generate embeddings for all chunks
+            texts = [chunk.content for chunk in chunks]
+            embeddings = await self._generate_embeddings(texts)
+            
+            # Store chunks and embeddings in database with one executemany INSERT
+            document_name = os.path.basename(file_path)
+            rows = [
+                {
+                    "chunk_id": chunk.chunk_id,
+                    "document_name": document_name,
+                    "content": chunk.content,
+                    "chunk_type": chunk.metadata.get("chunk_type", "general"),
+                    "page_number": chunk.metadata.get("page_number", 1),
+                    "file_hash": hash_to_use,
+                    "embedding": embeddings[i],
+                    "chunk_metadata": json.dumps(chunk.metadata)
+                }
+                for i, chunk in enumerate(chunks)
+            ]
+            with self.SessionLocal() as db:
+                db.execute(insert(DBDocumentChunk), rows)
+                db.commit()
+            
+            self.document_status[file_path] = {
+                "status": "loaded",
+                "last_updated": datetime.now(),
+                "chunk_count": len(chunks)
+            }
+            
+            # Get chunk statistics
+            chunk_stats = self.document_processor.get_chunk_stats(chunks)
+            logger.info(f"Added {len(chunks)} chunks from {file_path} using Gemini embeddings")
+            logger.info(f"Chunk stats: avg_size={chunk_stats.get('average_size', 0):.0f}, min={chunk_stats.get('min_size', 0)}, max={chunk_stats.get('max_size', 0)}")
+            logger.info(f"Chunking method: {chunk_stats.get('chunking_method', 'unknown')}")
+            
+            return {
+                "file": file_path,
+                "chunk_count": len(chunks)
+            }
+    
     async def add_documents(self, file_paths: List[str], file_hash: str = None) -> Dict[str, Any]:
-        """Add documents to the PostgreSQL vector database"""
+        """Add documents to the PostgreSQL vector database, processing files concurrently"""
         try:
             results = {"processed": [], "failed": []}
             
-            for file_path in file_paths:
-                try:
-                    # Compute hash if not provided
-                    hash_to_use = file_hash or self._get_file_hash(file_path)
-                    self.document_status[file_path] = {
-                        "status": "processing",
-                        "last_updated": datetime.now(),
-                        "chunk_count": 0
-                    }
-                    
-                    # Process PDF
-                    logger.info(f"Processing PDF: {file_path}")
-                    chunks = await self.document_processor.process_pdf(file_path)
-                    logger.info(f"Created {len(chunks)} chunks for {file_path}")
-                    
-                    if not chunks:
-                        logger.warning(f"No chunks extracted from {file_path}")
-                        continue
-                    
-                    # Generate embeddings for all chunks
-                    texts = [chunk.content for chunk in chunks]
-                    embeddings = await self._generate_embeddings(texts)
-                    
-                    # Store chunks and embeddings in database
-                    with self.SessionLocal() as db:
-                        for i, chunk in enumerate(chunks):
-                            db_chunk = DBDocumentChunk(
-                                chunk_id=chunk.chunk_id,
-                                document_name=os.path.basename(file_path),
-                                content=chunk.content,
-                                chunk_type=chunk.metadata.get("chunk_type", "general"),
-                                page_number=chunk.metadata.get("page_number", 1),
-                                file_hash=hash_to_use,
-                                embedding=embeddings[i],
-                                chunk_metadata=json.dumps(chunk.metadata)
-                            )
-                            db.add(db_chunk)
-                        
-                        db.commit()
-                    
-                    self.document_status[file_path] = {
-                        "status": "loaded",
-                        "last_updated": datetime.now(),
-                        "chunk_count": len(chunks)
-                    }
-                    
-                    results["processed"].append({
-                        "file": file_path,
-                        "chunk_count": len(chunks)
-                    })
-                    
-                    # Get chunk statistics
-                    chunk_stats = self.document_processor.get_chunk_stats(chunks)
-                    logger.info(f"Added {len(chunks)} chunks from {file_path} using Gemini embeddings")
-                    logger.info(f"Chunk stats: avg_size={chunk_stats.get('average_size', 0):.0f}, min={chunk_stats.get('min_size', 0)}, max={chunk_stats.get('max_size', 0)}")
-                    logger.info(f"Chunking method: {chunk_stats.get('chunking_method', 'unknown')}")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing {file_path}: {str(e)}")
+            outcomes = await asyncio.gather(
+                *(self._process_one(file_path, file_hash) for file_path in file_paths),
+                return_exceptions=True
+            )
+            
+            for file_path, outcome in zip(file_paths, outcomes):
+                if isinstance(outcome, Exception):
+                    logger.error(f"Error processing {file_path}: {str(outcome)}")
                     self.document_status[file_path] = {
                         "status": "error",
                         "last_updated": datetime.now(),
-                        "error": str(e),
+                        "error": str(outcome),
                         "chunk_count": 0
                     }
                     results["failed"].append({
                         "file": file_path,
-                        "error": str(e)
+                        "error": str(outcome)
                     })
+                elif outcome is not None:
+                    results["processed"].append(outcome)
             
             return results
             
@@ -240,6 +349,29 @@ ANSWER:"""
             logger.error(f"Error adding documents: {str(e)}")
             raise
     
+    async def _embed_query(self, query: str) -> np.ndarray:
+        """Normalized float32 query embedding, served from the in-memory LRU when possible"""
+        key = embedding_cache_key(self._embedding_cache_model, query)
+        vector = self._query_embeddings.get(key)
+        if vector is not None:
+            self._query_embeddings.move_to_end(key)
+            return vector
+        
+        # Run the blocking SDK call off the event loop
+        result = await asyncio.to_thread(
+            genai.embed_content,
+            model=self.embedding_model,
+            content=query,
+            task_type="retrieval_query",
+            output_dimensionality=EMBEDDING_DIMENSIONS
+        )
+        vector = _normalize_rows(np.asarray(result['embedding'], dtype=np.float32))
+        
+        self._query_embeddings[key] = vector
+        if len(self._query_embeddings) > QUERY_EMBEDDING_CACHE_SIZE:
+            self._query_embeddings.popitem(last=False)
+        return vector
+    
     async def search_similar_documents(self, 
                                      query: str, 
                                      n_results: int = 20,
@@ -247,50 +379,10 @@ ANSWER:"""
         """Search for similar documents using cosine similarity with pgvector"""
         try:
             # Generate embedding for the query
-            query_embedding = genai.embed_content(
-                model=self.embedding_model,
-                content=query,
-                task_type="retrieval_query"
-            )
-            query_vector = query_embedding['embedding']
+            query_vector = (await self._embed_query(query)).tolist()
             
             with self.SessionLocal() as db:
-                # Build the similarity search query
-                sql_query = """
-                SELECT 
-                    content,
-                    chunk_metadata,
-                    chunk_type,
-                    document_name,
-                    page_number,
-                    1 - (embedding <=> CAST(:query_vector AS vector)) as similarity_score
-                FROM gemini_document_chunks
-                """
-                params = {"query_vector": query_vector}
-                conditions = []
-                
-                # Add metadata filters if provided
-                if filter_metadata:
-                    for key, value in filter_metadata.items():
-                        if key == "document_name":
-                            conditions.append("document_name = :document_name")
-                            params["document_name"] = value
-                        elif key == "chunk_type":
-                            conditions.append("chunk_type = :chunk_type")
-                            params["chunk_type"] = value
-                        elif key == "file_hash":
-                            conditions.append("file_hash = :file_hash")
-                            params["file_hash"] = value
-                
-                if conditions:
-                    sql_query += " WHERE " + " AND ".join(conditions)
-                
-                sql_query += " ORDER BY embedding <=> CAST(:query_vector AS vector) LIMIT :n_results"
-                params["n_results"] = n_results
-                
-                # Execute the query
-                result = db.execute(text(sql_query), params)
-                rows = result.fetchall()
+                rows = search_chunks(db, query_vector, n_results, filter_metadata)
                 
                 # Format results
                 formatted_results = []
@@ -354,27 +446,23 @@ ANSWER:"""
         """Get the status of loaded documents"""
         try:
             with self.SessionLocal() as db:
-                # Get total counts
-                total_chunks = db.query(DBDocumentChunk).count()
-                total_documents = db.query(DBDocumentChunk.document_name).distinct().count()
+                # Per-document chunk counts in a single GROUP BY query
+                rows = db.query(
+                    DBDocumentChunk.document_name, func.count()
+                ).group_by(DBDocumentChunk.document_name).all()
                 
-                # Get document details
-                documents = []
-                for doc_name in db.query(DBDocumentChunk.document_name).distinct():
-                    doc_name = doc_name[0]
-                    chunk_count = db.query(DBDocumentChunk).filter(
-                        DBDocumentChunk.document_name == doc_name
-                    ).count()
-                    
-                    documents.append({
+                documents = [
+                    {
                         "document_name": doc_name,
                         "status": "loaded",
                         "chunk_count": chunk_count
-                    })
+                    }
+                    for doc_name, chunk_count in rows
+                ]
                 
                 return {
-                    "total_documents": total_documents,
-                    "total_chunks": total_chunks,
+                    "total_documents": len(rows),
+                    "total_chunks": sum(chunk_count for _, chunk_count in rows),
                     "documents": documents,
                     "embedding_model": self.embedding_model,
                     "llm_model": self.llm_model
@@ -402,6 +490,9 @@ ANSWER:"""
         """Close database connections"""
         if self.engine:
             self.engine.dispose()
+        self._embedding_executor.shutdown(wait=False)
+        self._pdf_pool.shutdown(wait=False)
+        self.embedding_cache.close()
 
 # Standalone testing functions
 async def test_gemini_vector_service():
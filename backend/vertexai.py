@@ -1,34 +1,42 @@
 import os
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import logging
 import json
+import multiprocessing
 import hashlib
+import random
+import time
 from pathlib import Path
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import sys
 
 # Add the backend directory to the path so we can import from app
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import func, insert
 import numpy as np
 
 # Vertex AI imports
 import vertexai
+from google.api_core import exceptions as google_exceptions
 from vertexai.generative_models import GenerativeModel
 from vertexai.language_models import TextEmbeddingModel
 
 # Import from the existing app structure
 from app.models.schemas import DocumentStatus, DocumentsStatus
 from app.utils.logging_config import get_logger
+from app.utils.file_hash_cache import compute_file_hash, get_cached_file_hash, set_cached_file_hash
 
 # Import Gemini-specific database model
-from gemini_database import create_session_factory, GeminiDocumentChunk as DBDocumentChunk, init_gemini_database
+from gemini_database import create_session_factory, GeminiDocumentChunk as DBDocumentChunk, init_gemini_database, EMBEDDING_DIMENSIONS, search_chunks
 
 # Import the Gemini-specific document processor
-from gemini_document_processor import GeminiDocumentProcessor, DocumentChunk
+from gemini_document_processor import GeminiDocumentProcessor, DocumentChunk, init_worker_processor, extract_chunks
 
 # Configure logging
 logging.basicConfig(
@@ -41,6 +49,85 @@ logging.basicConfig(
 )
 logger = get_logger("vertexai_vector_service")
 
+# Maximum number of texts per get_embeddings call (Vertex AI accepts up to 250)
+EMBEDDING_BATCH_SIZE = 250
+
+# Maximum number of get_embeddings calls in flight at once
+MAX_PARALLEL_EMBEDDING_CALLS = 8
+
+# Recent query embeddings kept in memory (repeated queries skip the embedding call)
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+
+# Generated answers kept in memory, keyed by question and retrieved context
+ANSWER_CACHE_SIZE = 1000
+
+# Seconds a cached answer stays valid
+ANSWER_CACHE_TTL_SECONDS = 3600
+
+# Transient Vertex AI errors retried with backoff instead of failing the request
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded
+)
+
+# Attempts per Vertex AI call, and the bounds of the exponential backoff between them (seconds)
+MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+
+# Maximum number of files embedded concurrently (bounds memory and embedding quota)
+MAX_CONCURRENT_FILES = 4
+
+# Worker processes used for PDF parsing
+PDF_PARSE_WORKERS = min(4, os.cpu_count() or 1)
+
+# Files buffered between ingest pipeline stages (bounds memory and applies backpressure)
+PIPELINE_QUEUE_SIZE = 4
+
+# End-of-stream marker passed between pipeline stages
+_SENTINEL = None
+
+# RAG prompt, filled with the retrieved context and the user's question
+ANSWER_PROMPT_TEMPLATE = """You are an AI assistant helping with regulatory compliance analysis. 
+            
+Based on the following context documents, please answer the user's question:
+
+CONTEXT:
+{context}
+
+QUESTION: {query}
+
+Please provide a comprehensive answer based on the context provided. If the context doesn't contain enough information to answer the question, please indicate that clearly.
+
+ANSWER:"""
+
+# One retrieved document as it appears in the prompt context
+CONTEXT_DOCUMENT_TEMPLATE = "Document: {document_name} (Page {page_number})\nContent: {content}"
+_format_context_document = CONTEXT_DOCUMENT_TEMPLATE.format_map
+
+async def _call_with_retries(call, *args, **kwargs):
+    """Await call(*args, **kwargs), retrying RETRYABLE_ERRORS with full-jitter exponential backoff"""
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            return await call(*args, **kwargs)
+        except RETRYABLE_ERRORS as e:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+            logger.warning(f"Vertex AI call failed ({e.__class__.__name__}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+def _answer_cache_key(query: str, context_documents: List[Dict[str, Any]]) -> str:
+    """Key for an answer generated from query and exactly these context documents"""
+    digest = hashlib.blake2b(query.encode(), digest_size=16)
+    for doc in context_documents:
+        digest.update(b"\0")
+        digest.update(f"{doc['document_name']}:{doc['page_number']}:".encode())
+        digest.update(doc["content"].encode())
+    return digest.hexdigest()
+
 class VertexAIVectorService:
     """
     Standalone Vector Service using Google Cloud Vertex AI for embeddings and LLM processing
@@ -50,9 +137,13 @@ class VertexAIVectorService:
                  embedding_model: str = "text-embedding-004",
                  llm_model: str = "gemini-1.5-flash",
                  project_id: str = None,
-                 location: str = "us-central1"):
+                 location: str = "us-central1",
+                 embedding_batch_size: int = EMBEDDING_BATCH_SIZE,
+                 max_parallel_embedding_calls: int = MAX_PARALLEL_EMBEDDING_CALLS):
         
         self.embedding_model = embedding_model
+        self.embedding_batch_size = embedding_batch_size
+        self._embedding_semaphore = asyncio.Semaphore(max_parallel_embedding_calls)
         self.llm_model = llm_model
         self.project_id = project_id or os.getenv("GOOGLE_CLOUD_PROJECT")
         self.location = location
@@ -79,21 +170,77 @@ class VertexAIVectorService:
             min_chunk_size=100    # Minimum chunk size
         )
         
+        # CPU-bound PDF parsing runs in worker processes, several files at a time
+        self._pdf_pool = self._create_pdf_pool()
+        
         # Track document processing status
         self.document_status = {}
         
+        # LRU of query embeddings keyed by query text
+        self._query_embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        
+        # LRU of generated answers, as key -> (expires_at, answer)
+        self._answer_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        
+        # File hashes memoized by path, as (mtime_ns, size, hash)
+        self._hash_cache: Dict[str, Tuple[int, int, str]] = {}
+        
         logger.info(f"Initialized Vertex AI Vector Service with embedding model: {embedding_model}")
         logger.info(f"Using LLM model: {llm_model}")
         logger.info(f"Project ID: {self.project_id}, Location: {self.location}")
         logger.info(f"Chunking strategy: Character-based (no tiktoken) - max_size: {self.document_processor.max_chunk_size}, overlap: {self.document_processor.chunk_overlap}")
     
+    def _create_pdf_pool(self) -> ProcessPoolExecutor:
+        """Worker processes for CPU-bound PDF parsing, each with its own document processor"""
+        # Spawned rather than forked, as this process already runs gRPC/executor threads
+        return ProcessPoolExecutor(
+            max_workers=PDF_PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker_processor,
+            initargs=(
+                self.document_processor.max_chunk_size,
+                self.document_processor.chunk_overlap,
+                self.document_processor.min_chunk_size
+            )
+        )
+    
+    async def _extract_chunks(self, file_path: str, compute_hash: bool) -> Tuple[Optional[str], List[DocumentChunk]]:
+        """Run extract_chunks in the process pool, replacing the pool if a worker died"""
+        pool = self._pdf_pool
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, extract_chunks, file_path, compute_hash)
+        except BrokenProcessPool:
+            # A dead worker breaks the whole pool: fail the files it held, but parse later files in a new one
+            if self._pdf_pool is pool:
+                logger.warning(f"PDF worker process died while parsing {file_path}; restarting the worker pool")
+                self._pdf_pool = self._create_pdf_pool()
+                pool.shutdown(wait=False)
+            raise
+    
+    def _lookup_file_hash(self, file_path: str, st: os.stat_result) -> Optional[str]:
+        """Memoized or xattr-cached SHA-256 hash of a file, if its mtime and size are unchanged"""
+        memo = self._hash_cache.get(file_path)
+        if memo and memo[:2] == (st.st_mtime_ns, st.st_size):
+            return memo[2]
+        
+        file_hash = get_cached_file_hash(file_path, st)
+        if file_hash is not None:
+            self._hash_cache[file_path] = (st.st_mtime_ns, st.st_size, file_hash)
+        return file_hash
+    
+    def _remember_file_hash(self, file_path: str, st: os.stat_result, file_hash: str):
+        """Record a freshly computed hash in the memo and the xattr cache"""
+        set_cached_file_hash(file_path, file_hash, st)
+        self._hash_cache[file_path] = (st.st_mtime_ns, st.st_size, file_hash)
+    
     def _get_file_hash(self, file_path: str) -> str:
-        """Compute MD5 hash of a file for change detection"""
-        hash_md5 = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+        """Get a file's SHA-256 hash, reusing the memoized or cached value when mtime and size are unchanged"""
+        st = os.stat(file_path)
+        file_hash = self._lookup_file_hash(file_path, st)
+        if file_hash is None:
+            file_hash = compute_file_hash(file_path)
+            self._remember_file_hash(file_path, st, file_hash)
+        return file_hash
     
     async def initialize_database(self):
         """Initialize PostgreSQL database with pgvector extension"""
@@ -106,14 +253,40 @@ class VertexAIVectorService:
             logger.error(f"Error initializing PostgreSQL database: {str(e)}")
             raise
     
-    async def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings using Vertex AI"""
+    async def _generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Generate a (len(texts), D) float32 embedding matrix using Vertex AI, with batches requested concurrently"""
+        if not texts:
+            # reshape(0, -1) below cannot infer the width of an empty result
+            return np.empty((0, EMBEDDING_DIMENSIONS), dtype=np.float32)
+        
         try:
-            embeddings = []
-            for text in texts:
-                # Generate embedding for each text using Vertex AI
-                result = self.embedding_model_instance.get_embeddings([text])
-                embeddings.append(result[0].values)
+            async def embed_batch(batch: List[str]):
+                # Backoff sleeps hold the permit, so rate limiting also slows the other batches
+                async with self._embedding_semaphore:
+                    return await _call_with_retries(
+                        self.embedding_model_instance.get_embeddings_async,
+                        batch,
+                        output_dimensionality=EMBEDDING_DIMENSIONS
+                    )
+            
+            # Batch texts of similar length together so short chunks are not padded to long ones
+            order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+            sorted_texts = [texts[i] for i in order]
+            
+            results = await asyncio.gather(*(
+                embed_batch(sorted_texts[start:start + self.embedding_batch_size])
+                for start in range(0, len(sorted_texts), self.embedding_batch_size)
+            ))
+            # gather preserves batch order, so the rows line up with sorted_texts; scatter them back
+            embeddings = np.empty((len(texts), EMBEDDING_DIMENSIONS), dtype=np.float32)
+            embeddings[order] = np.asarray(
+                [embedding.values for result in results for embedding in result],
+                dtype=np.float32
+            ).reshape(len(texts), -1)
+            
+            # Unit-normalize so the shared table can be ranked by inner product
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.maximum(norms, 1e-12)
             
             logger.debug(f"Generated {len(embeddings)} embeddings using Vertex AI")
             return embeddings
@@ -123,83 +296,155 @@ class VertexAIVectorService:
             raise
     
     async def generate_answer(self, query: str, context_documents: List[Dict[str, Any]]) -> str:
-        """Generate answer using Vertex AI Gemini Flash LLM"""
+        """Generate answer using Vertex AI Gemini Flash LLM, reusing a cached answer for the same question and context"""
         try:
-            # Prepare context from retrieved documents
-            context = "\n\n".join([
-                f"Document: {doc['document_name']} (Page {doc['page_number']})\n"
-                f"Content: {doc['content']}"
-                for doc in context_documents
-            ])
+            key = _answer_cache_key(query, context_documents)
+            cached = self._answer_cache.get(key)
+            if cached is not None:
+                expires_at, answer = cached
+                if expires_at > time.monotonic():
+                    self._answer_cache.move_to_end(key)
+                    logger.debug(f"Answer cache hit for query: {query}")
+                    return answer
+                del self._answer_cache[key]
             
-            # Create prompt
-            prompt = f"""You are an AI assistant helping with regulatory compliance analysis. 
-            
-Based on the following context documents, please answer the user's question:
-
-CONTEXT:
-{context}
-
-QUESTION: {query}
-
-Please provide a comprehensive answer based on the context provided. If the context doesn't contain enough information to answer the question, please indicate that clearly.
-
-ANSWER:"""
+            # Fill the precomputed templates with the retrieved documents
+            context = "\n\n".join(map(_format_context_document, context_documents))
+            prompt = ANSWER_PROMPT_TEMPLATE.format(context=context, query=query)
             
             # Generate response using Vertex AI
-            response = self.llm.generate_content(prompt)
+            response = await _call_with_retries(self.llm.generate_content_async, prompt)
+            
+            answer = response.text
+            
+            self._answer_cache[key] = (time.monotonic() + ANSWER_CACHE_TTL_SECONDS, answer)
+            if len(self._answer_cache) > ANSWER_CACHE_SIZE:
+                self._answer_cache.popitem(last=False)
             
             logger.debug(f"Generated answer for query: {query}")
-            return response.text
+            return answer
             
         except Exception as e:
             logger.error(f"Error generating answer with Vertex AI: {str(e)}")
             raise
     
+    def _insert_rows(self, rows: List[Dict[str, Any]]):
+        """Store chunk rows with one executemany INSERT"""
+        with self.SessionLocal() as db:
+            db.execute(insert(DBDocumentChunk), rows)
+            db.commit()
+    
     async def add_documents(self, file_paths: List[str], file_hash: str = None) -> Dict[str, Any]:
-        """Add documents to the PostgreSQL vector database"""
+        """
+        Add documents to the PostgreSQL vector database
+        
+        Files flow through load -> embed -> insert stages joined by bounded
+        queues, so PDFs are parsed while earlier ones are embedded (up to
+        MAX_CONCURRENT_FILES at once) and written.
+        """
         try:
             results = {"processed": [], "failed": []}
+            embed_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+            insert_queue = asyncio.Queue(maxsize=PIPELINE_QUEUE_SIZE)
             
-            for file_path in file_paths:
-                try:
-                    # Compute hash if not provided
-                    hash_to_use = file_hash or self._get_file_hash(file_path)
-                    self.document_status[file_path] = {
-                        "status": "processing",
-                        "last_updated": datetime.now(),
-                        "chunk_count": 0
-                    }
+            def fail(file_path: str, error: Exception):
+                logger.error(f"Error processing {file_path}: {str(error)}")
+                self.document_status[file_path] = {
+                    "status": "error",
+                    "last_updated": datetime.now(),
+                    "error": str(error),
+                    "chunk_count": 0
+                }
+                results["failed"].append({
+                    "file": file_path,
+                    "error": str(error)
+                })
+            
+            async def loader():
+                # Parse up to two files per worker process ahead, handing them on in input order
+                in_flight = deque()
+                pending = iter(file_paths)
+                while True:
+                    while len(in_flight) < PDF_PARSE_WORKERS * 2:
+                        file_path = next(pending, None)
+                        if file_path is None:
+                            break
+                        self.document_status[file_path] = {
+                            "status": "processing",
+                            "last_updated": datetime.now(),
+                            "chunk_count": 0
+                        }
+                        logger.info(f"Processing PDF: {file_path}")
+                        try:
+                            # Stat before the worker reads the file so a cached hash is never newer than the contents
+                            st = os.stat(file_path)
+                            known_hash = file_hash or self._lookup_file_hash(file_path, st)
+                            # Without a known hash the worker hashes the bytes it parses, so the file is read once
+                            future = asyncio.ensure_future(self._extract_chunks(file_path, known_hash is None))
+                        except Exception as e:
+                            fail(file_path, e)
+                            continue
+                        in_flight.append((file_path, st, known_hash, future))
+                    if not in_flight:
+                        break
                     
-                    # Process PDF
-                    logger.info(f"Processing PDF: {file_path}")
-                    chunks = await self.document_processor.process_pdf(file_path)
+                    file_path, st, known_hash, future = in_flight.popleft()
+                    try:
+                        computed_hash, chunks = await future
+                    except Exception as e:
+                        fail(file_path, e)
+                        continue
+                    hash_to_use = known_hash or computed_hash
+                    if known_hash is None:
+                        self._remember_file_hash(file_path, st, computed_hash)
                     logger.info(f"Created {len(chunks)} chunks for {file_path}")
                     
                     if not chunks:
                         logger.warning(f"No chunks extracted from {file_path}")
                         continue
-                    
-                    # Generate embeddings for all chunks
-                    texts = [chunk.content for chunk in chunks]
-                    embeddings = await self._generate_embeddings(texts)
-                    
-                    # Store chunks and embeddings in database
-                    with self.SessionLocal() as db:
-                        for i, chunk in enumerate(chunks):
-                            db_chunk = DBDocumentChunk(
-                                chunk_id=chunk.chunk_id,
-                                document_name=os.path.basename(file_path),
-                                content=chunk.content,
-                                chunk_type=chunk.metadata.get("chunk_type", "general"),
-                                page_number=chunk.metadata.get("page_number", 1),
-                                file_hash=hash_to_use,
-                                embedding=embeddings[i],
-                                chunk_metadata=json.dumps(chunk.metadata)
-                            )
-                            db.add(db_chunk)
-                        
-                        db.commit()
+                    await embed_queue.put((file_path, hash_to_use, chunks))
+                for _ in range(MAX_CONCURRENT_FILES):
+                    await embed_queue.put(_SENTINEL)
+            
+            async def embedder():
+                # One file at a time per embedder; _generate_embeddings fans it out into parallel batches
+                while (item := await embed_queue.get()) is not _SENTINEL:
+                    file_path, hash_to_use, chunks = item
+                    try:
+                        embeddings = await self._generate_embeddings([chunk.content for chunk in chunks])
+                    except Exception as e:
+                        fail(file_path, e)
+                        continue
+                    await insert_queue.put((file_path, hash_to_use, chunks, embeddings))
+                await insert_queue.put(_SENTINEL)
+            
+            async def upserter():
+                remaining = MAX_CONCURRENT_FILES
+                while remaining:
+                    item = await insert_queue.get()
+                    if item is _SENTINEL:
+                        remaining -= 1
+                        continue
+                    file_path, hash_to_use, chunks, embeddings = item
+                    document_name = os.path.basename(file_path)
+                    rows = [
+                        {
+                            "chunk_id": chunk.chunk_id,
+                            "document_name": document_name,
+                            "content": chunk.content,
+                            "chunk_type": chunk.metadata.get("chunk_type", "general"),
+                            "page_number": chunk.metadata.get("page_number", 1),
+                            "file_hash": hash_to_use,
+                            "embedding": embeddings[i],
+                            "chunk_metadata": json.dumps(chunk.metadata)
+                        }
+                        for i, chunk in enumerate(chunks)
+                    ]
+                    try:
+                        await asyncio.to_thread(self._insert_rows, rows)
+                    except Exception as e:
+                        fail(file_path, e)
+                        continue
                     
                     self.document_status[file_path] = {
                         "status": "loaded",
@@ -217,90 +462,74 @@ ANSWER:"""
                     logger.info(f"Added {len(chunks)} chunks from {file_path} using Vertex AI embeddings")
                     logger.info(f"Chunk stats: avg_size={chunk_stats.get('average_size', 0):.0f}, min={chunk_stats.get('min_size', 0)}, max={chunk_stats.get('max_size', 0)}")
                     logger.info(f"Chunking method: {chunk_stats.get('chunking_method', 'unknown')}")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing {file_path}: {str(e)}")
-                    self.document_status[file_path] = {
-                        "status": "error",
-                        "last_updated": datetime.now(),
-                        "error": str(e),
-                        "chunk_count": 0
-                    }
-                    results["failed"].append({
-                        "file": file_path,
-                        "error": str(e)
-                    })
             
+            await asyncio.gather(
+                loader(),
+                *(embedder() for _ in range(MAX_CONCURRENT_FILES)),
+                upserter()
+            )
             return results
             
         except Exception as e:
             logger.error(f"Error adding documents: {str(e)}")
             raise
     
+    async def _embed_query(self, query: str) -> np.ndarray:
+        """float32 query embedding, served from the in-memory LRU when possible"""
+        vector = self._query_embeddings.get(query)
+        if vector is not None:
+            self._query_embeddings.move_to_end(query)
+            return vector
+        
+        result = await _call_with_retries(
+            self.embedding_model_instance.get_embeddings_async,
+            [query],
+            output_dimensionality=EMBEDDING_DIMENSIONS
+        )
+        vector = np.asarray(result[0].values, dtype=np.float32)
+        vector /= max(np.linalg.norm(vector), 1e-12)
+        # Shared between callers through the cache
+        vector.flags.writeable = False
+        
+        self._query_embeddings[query] = vector
+        if len(self._query_embeddings) > QUERY_EMBEDDING_CACHE_SIZE:
+            self._query_embeddings.popitem(last=False)
+        return vector
+    
+    def _search_rows(self, query_vector: List[float], n_results: int,
+                     filter_metadata: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run the similarity search and format rows as they stream in from the cursor"""
+        with self.SessionLocal() as db:
+            return [
+                {
+                    "content": row[0],
+                    "metadata": json.loads(row[1]) if row[1] else {},
+                    "chunk_type": row[2],
+                    "document_name": row[3],
+                    "page_number": row[4],
+                    "similarity_score": float(row[5]),
+                    "distance": 1.0 - float(row[5])
+                }
+                for row in search_chunks(db, query_vector, n_results, filter_metadata)
+            ]
+    
     async def search_similar_documents(self, 
                                      query: str, 
                                      n_results: int = 20,
                                      filter_metadata: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Search for similar documents using cosine similarity with pgvector"""
+        """Search for similar documents: half-precision HNSW candidates re-ranked in full precision"""
         try:
             # Generate embedding for the query using Vertex AI
-            query_embedding = self.embedding_model_instance.get_embeddings([query])
-            query_vector = query_embedding[0].values
+            query_vector = (await self._embed_query(query)).tolist()
+            
+            # The synchronous driver would block the event loop, so query from a pooled thread
+            formatted_results = await asyncio.to_thread(
+                self._search_rows, query_vector, n_results, filter_metadata
+            )
+            
+            logger.debug(f"Found {len(formatted_results)} similar documents for query: {query}")
+            return formatted_results
             
-            with self.SessionLocal() as db:
-                # Build the similarity search query
-                sql_query = """
-                SELECT 
-                    content,
-                    chunk_metadata,
-                    chunk_type,
-                    document_name,
-                    page_number,
-                    1 - (embedding <=> CAST(:query_vector AS vector)) as similarity_score
-                FROM gemini_document_chunks
-                """
-                params = {"query_vector": query_vector}
-                conditions = []
-                
-                # Add metadata filters if provided
-                if filter_metadata:
-                    for key, value in filter_metadata.items():
-                        if key == "document_name":
-                            conditions.append("document_name = :document_name")
-                            params["document_name"] = value
-                        elif key == "chunk_type":
-                            conditions.append("chunk_type = :chunk_type")
-                            params["chunk_type"] = value
-                        elif key == "file_hash":
-                            conditions.append("file_hash = :file_hash")
-                            params["file_hash"] = value
-                
-                if conditions:
-                    sql_query += " WHERE " + " AND ".join(conditions)
-                
-                sql_query += " ORDER BY embedding <=> CAST(:query_vector AS vector) LIMIT :n_results"
-                params["n_results"] = n_results
-                
-                # Execute the query
-                result = db.execute(text(sql_query), params)
-                rows = result.fetchall()
-                
-                # Format results
-                formatted_results = []
-                for row in rows:
-                    formatted_results.append({
-                        "content": row[0],
-                        "metadata": json.loads(row[1]) if row[1] else {},
-                        "chunk_type": row[2],
-                        "document_name": row[3],
-                        "page_number": row[4],
-                        "similarity_score": float(row[5]),
-                        "distance": 1.0 - float(row[5])
-                    })
-                
-                logger.debug(f"Found {len(formatted_results)} similar documents for query: {query}")
-                return formatted_results
-                
         except Exception as e:
             logger.error(f"Error searching documents: {str(e)}")
             raise
@@ -347,27 +576,23 @@ ANSWER:"""
         """Get the status of loaded documents"""
         try:
             with self.SessionLocal() as db:
-                # Get total counts
-                total_chunks = db.query(DBDocumentChunk).count()
-                total_documents = db.query(DBDocumentChunk.document_name).distinct().count()
+                # Per-document chunk counts in a single GROUP BY query
+                rows = db.query(
+                    DBDocumentChunk.document_name, func.count()
+                ).group_by(DBDocumentChunk.document_name).all()
                 
-                # Get document details
-                documents = []
-                for doc_name in db.query(DBDocumentChunk.document_name).distinct():
-                    doc_name = doc_name[0]
-                    chunk_count = db.query(DBDocumentChunk).filter(
-                        DBDocumentChunk.document_name == doc_name
-                    ).count()
-                    
-                    documents.append({
+                documents = [
+                    {
                         "document_name": doc_name,
                         "status": "loaded",
                         "chunk_count": chunk_count
-                    })
+                    }
+                    for doc_name, chunk_count in rows
+                ]
                 
                 return {
-                    "total_documents": total_documents,
-                    "total_chunks": total_chunks,
+                    "total_documents": len(rows),
+                    "total_chunks": sum(chunk_count for _, chunk_count in rows),
                     "documents": documents,
                     "embedding_model": self.embedding_model,
                     "llm_model": self.llm_model,
@@ -387,6 +612,7 @@ ANSWER:"""
                 db.commit()
             
             self.document_status = {}
+            self._answer_cache.clear()
             logger.info("Cleared all documents from database")
             
         except Exception as e:
@@ -397,6 +623,7 @@ ANSWER:"""
         """Close database connections"""
         if self.engine:
             self.engine.dispose()
+        self._pdf_pool.shutdown(wait=False)
 
 # Standalone testing functions
 async def test_vertexai_vector_service():
@@ -1,4 +1,5 @@
--- Enable pgvector extension
+-- Enable pgvector extension (0.7.0 or later: binary_quantize, bit_hamming_ops and halfvec
+-- are used by the schema; the backend refuses to start on older versions)
 CREATE EXTENSION IF NOT EXISTS vector;
 
 -- Create database if it doesn't exist
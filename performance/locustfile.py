@@ -2,6 +2,7 @@
 Performance testing with Locust for RegReportRAG API
 """
 import json
+import logging
 import random
 from locust import HttpUser, task, between, events
 from typing import Dict, Any
@@ -174,14 +175,6 @@ class DocumentManagementUser(HttpUser):
                 response.failure(f"Document reload failed: {response.status_code}")
 
 # Custom event handlers for monitoring
-@events.request.add_listener
-def my_request_handler(request_type, name, response_time, response_length, response, context, exception, start_time, url, **kwargs):
-    """Custom request handler for detailed monitoring."""
-    if exception:
-        print(f"Request failed: {name} - {exception}")
-    elif response.status_code >= 400:
-        print(f"Request error: {name} - {response.status_code}")
-
 @events.test_start.add_listener
 def on_test_start(environment, **kwargs):
     """Called when the test starts."""
@@ -194,18 +187,30 @@ def on_test_stop(environment, **kwargs):
     """Called when the test stops."""
     print("Performance test completed.")
 
+# Response times above this (ms) share the histogram's last bucket
+MAX_TRACKED_RESPONSE_TIME_MS = 60_000
+
 # Custom metrics collection
 class CustomMetrics:
-    """Custom metrics collection for detailed performance analysis."""
+    """Custom metrics collection for detailed performance analysis.
+    
+    Response times are kept as a running sum/count plus a fixed-size
+    1 ms histogram, so memory and per-request cost stay constant however
+    long the test runs.
+    """
     
     def __init__(self):
-        self.response_times = []
+        self.response_time_sum = 0.0
+        self.response_count = 0
+        self.response_time_histogram = [0] * (MAX_TRACKED_RESPONSE_TIME_MS + 1)
         self.error_counts = {}
         self.success_counts = {}
     
     def record_response(self, name: str, response_time: float, success: bool):
         """Record response metrics."""
-        self.response_times.append(response_time)
+        self.response_time_sum += response_time
+        self.response_count += 1
+        self.response_time_histogram[min(int(response_time), MAX_TRACKED_RESPONSE_TIME_MS)] += 1
         
         if success:
             self.success_counts[name] = self.success_counts.get(name, 0) + 1
@@ -214,12 +219,24 @@ class CustomMetrics:
     
     def get_average_response_time(self) -> float:
         """Get average response time."""
-        return sum(self.response_times) / len(self.response_times) if self.response_times else 0
+        return self.response_time_sum / self.response_count if self.response_count else 0
+    
+    def get_response_time_percentile(self, percentile: float) -> int:
+        """Get the response time (ms, 1 ms resolution) at or below which percentile % of responses fall."""
+        if not self.response_count:
+            return 0
+        target = self.response_count * percentile / 100
+        seen = 0
+        for response_time, count in enumerate(self.response_time_histogram):
+            seen += count
+            if seen >= target:
+                return response_time
+        return MAX_TRACKED_RESPONSE_TIME_MS
     
     def get_error_rate(self) -> Dict[str, float]:
         """Get error rates by endpoint."""
         error_rates = {}
-        for name in set(list(self.success_counts.keys()) + list(self.error_counts.keys())):
+        for name in self.success_counts.keys() | self.error_counts.keys():
             total = self.success_counts.get(name, 0) + self.error_counts.get(name, 0)
             if total > 0:
                 error_rates[name] = self.error_counts.get(name, 0) / total
@@ -228,17 +245,30 @@ class CustomMetrics:
 # Global metrics instance
 metrics = CustomMetrics()
 
+# Failures are reported only when Locust's own logger would show warnings
+_locust_logger = logging.getLogger("locust")
+
 @events.request.add_listener
-def metrics_handler(request_type, name, response_time, response_length, response, context, exception, start_time, url, **kwargs):
-    """Handler for collecting custom metrics."""
-    success = response.status_code < 400 and exception is None
+def on_request(request_type, name, response_time, response_length, response, context, exception, start_time, url, **kwargs):
+    """Single request listener: collect custom metrics and report failed requests."""
+    success = exception is None and response.status_code < 400
     metrics.record_response(name, response_time, success)
+    
+    if not success and _locust_logger.isEnabledFor(logging.WARNING):
+        if exception:
+            print(f"Request failed: {name} - {exception}")
+        else:
+            print(f"Request error: {name} - {response.status_code}")
 
 @events.test_stop.add_listener
 def print_metrics(environment, **kwargs):
     """Print custom metrics at test end."""
     print("\n=== Custom Performance Metrics ===")
     print(f"Average Response Time: {metrics.get_average_response_time():.2f}ms")
+    print(
+        f"Response Time Percentiles: p50={metrics.get_response_time_percentile(50)}ms "
+        f"p95={metrics.get_response_time_percentile(95)}ms p99={metrics.get_response_time_percentile(99)}ms"
+    )
     print("Error Rates by Endpoint:")
     for endpoint, rate in metrics.get_error_rate().items():
         print(f"  {endpoint}: {rate:.2%}")
@@ -4,38 +4,108 @@ RegReportRAG API Testing Script
 Tests both positive and negative scenarios for the compliance API
 """
 
+import asyncio
+import httpx
+import pytest
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import hashlib
 import json
+import os
 import time
 import sys
-from typing import Dict, Any
+from pathlib import Path
+from collections import namedtuple
+from typing import Dict, Any, List, Tuple
 
 # Configuration
 BASE_URL = "http://localhost:8000"
+HEALTH_ENDPOINT = f"{BASE_URL}/health"
 COMPLIANCE_ENDPOINT = f"{BASE_URL}/api/v1/compliance/check"
 DOCUMENTS_ENDPOINT = f"{BASE_URL}/api/v1/documents/status"
 RELOAD_ENDPOINT = f"{BASE_URL}/api/v1/documents/reload"
 
+# "Extremely Long Query" negative case, built and serialized once per run
+LONG_QUERY = "A" * 10000
+LONG_QUERY_BODY = json.dumps({"concern": LONG_QUERY}).encode()
+
+# Report lines are buffered and written once at the end; pass -v to print them as they arrive
+VERBOSE = "-v" in sys.argv[1:]
+_OUTPUT: List[str] = []
+
+# One pooled keep-alive session shared by every test (a fresh connection per request otherwise)
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "POST"]
+    )
+))
+SESSION.headers.update({"Content-Type": "application/json", "Connection": "keep-alive"})
+
+# Replay successful compliance responses from disk across runs (opt in with REGREPORT_TEST_CACHE=1;
+# delete the directory to invalidate)
+RESPONSE_CACHE_ENABLED = os.getenv("REGREPORT_TEST_CACHE") == "1"
+RESPONSE_CACHE_DIR = Path(__file__).parent / ".test_cache"
+
+# Async requests: attempts per request, base backoff between them (seconds), and statuses worth retrying
+REQUEST_ATTEMPTS = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Fields every compliance / document status response must carry
+REQUIRED_COMPLIANCE_FIELDS = frozenset(("status", "confidence_score", "reasoning", "compliance_details"))
+REQUIRED_STATUS_FIELDS = frozenset(("total_documents", "total_chunks"))
+
+# Bytes of an error response body read for failure messages (the rest is never downloaded)
+ERROR_BODY_PREVIEW_BYTES = 256
+
+# Requests in flight at once across all suites (stay within the backend's worker count)
+MAX_CONCURRENT_REQUESTS = 8
+
+def emit(line: str = ""):
+    """Queue a line of report output (printed immediately with -v)"""
+    if VERBOSE:
+        print(line)
+    else:
+        _OUTPUT.append(line)
+
+def flush_output():
+    """Write all queued report output in one call"""
+    if _OUTPUT:
+        sys.stdout.write("\n".join(_OUTPUT) + "\n")
+        sys.stdout.flush()
+        _OUTPUT.clear()
+
 def print_test_header(test_name: str):
     """Print formatted test header"""
-    print(f"\n{'='*60}")
-    print(f"🧪 {test_name}")
-    print(f"{'='*60}")
+    emit(f"\n{'='*60}")
+    emit(f"🧪 {test_name}")
+    emit(f"{'='*60}")
 
 def print_result(test_case: str, status: str, details: str = ""):
     """Print test result"""
     emoji = "✅" if status == "PASS" else "❌"
-    print(f"{emoji} {test_case}: {status}")
+    emit(f"{emoji} {test_case}: {status}")
     if details:
-        print(f"   Details: {details}")
+        emit(f"   Details: {details}")
 
-def test_api_connectivity():
+def check_api_connectivity():
     """Test if API is accessible"""
     print_test_header("API Connectivity Test")
     
     try:
-        response = requests.get(f"{BASE_URL}/docs", timeout=5)
-        if response.status_code == 200:
+        try:
+            # Bodiless liveness probe; 405 still means the server answered
+            response = SESSION.head(HEALTH_ENDPOINT, timeout=2)
+        except requests.exceptions.RequestException:
+            response = SESSION.get(f"{BASE_URL}/docs", timeout=5)
+        if response.status_code in {200, 405}:
             print_result("API Server", "PASS", "Backend is running and accessible")
             return True
         else:
@@ -45,217 +115,346 @@ def test_api_connectivity():
         print_result("API Server", "FAIL", f"Connection error: {e}")
         return False
 
-def test_positive_scenarios():
-    """Test positive compliance scenarios"""
-    print_test_header("Positive Scenarios")
-    
-    test_cases = [
-        {
-            "name": "Compliant Query",
-            "query": "We maintain customer data in encrypted databases with access controls and audit logs as required by data protection regulations.",
-            "expected_status": ["compliant", "partial_compliance"]
-        },
-        {
-            "name": "Partial Compliance Query", 
-            "query": "We collect customer personal information and store it in our database, but we don't have a formal data retention policy.",
-            "expected_status": ["partial_compliance", "non_compliant", "requires_review"]
-        },
-        {
-            "name": "Complex Regulatory Query",
-            "query": "Our new mobile banking app collects biometric data, location information, and transaction history. We use third-party analytics providers and cloud storage. What are the compliance requirements?",
-            "expected_status": ["requires_review", "partial_compliance"]
-        }
-    ]
-    
-    for test_case in test_cases:
+def warm_up_backend():
+    """Prime the backend's lazily loaded models and index so suite timings reflect steady state"""
+    start_ns = time.perf_counter_ns()
+    try:
+        SESSION.post(COMPLIANCE_ENDPOINT, json={"concern": "warmup"}, timeout=60)
+        SESSION.get(DOCUMENTS_ENDPOINT, timeout=10)
+    except requests.exceptions.RequestException as e:
+        # Warmup is best effort; the suites report any real failure
+        emit(f"⚠️ Warmup failed: {e}")
+        return
+    emit(f"⏱️ Warmed up backend in {(time.perf_counter_ns() - start_ns) / 1e9:.2f}s")
+
+def _async_client() -> httpx.AsyncClient:
+    """Keep-alive async client shared by the concurrently running suites"""
+    return httpx.AsyncClient(
+        headers={"Content-Type": "application/json"},
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=16)
+    )
+
+async def _send(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request, reading the full body only for successful responses"""
+    request = client.build_request(method, url, **kwargs)
+    response = await client.send(request, stream=True)
+    try:
+        if response.is_success:
+            await response.aread()
+            return response
+        
+        # Failures only ever show the start of the body, so stop reading after the preview
+        preview = b""
+        async for chunk in response.aiter_bytes():
+            preview += chunk
+            if len(preview) >= ERROR_BODY_PREVIEW_BYTES:
+                break
+        return httpx.Response(response.status_code, content=preview[:ERROR_BODY_PREVIEW_BYTES], request=request)
+    finally:
+        await response.aclose()
+
+async def _request(client: httpx.AsyncClient, method: str, url: str, retry: bool = True, **kwargs) -> httpx.Response:
+    """Send a request, retrying transport errors and RETRY_STATUSES with exponential backoff"""
+    attempts = REQUEST_ATTEMPTS if retry else 1
+    for attempt in range(attempts):
+        last_attempt = attempt == attempts - 1
         try:
-            start_time = time.time()
-            response = requests.post(
-                COMPLIANCE_ENDPOINT,
-                json={"concern": test_case["query"]},
-                headers={"Content-Type": "application/json"},
-                timeout=30
-            )
-            end_time = time.time()
-            
-            if response.status_code == 200:
-                result = response.json()
-                response_time = end_time - start_time
-                
-                # Check if response has expected structure
-                required_fields = ["status", "confidence_score", "reasoning", "compliance_details"]
-                has_required_fields = all(field in result for field in required_fields)
-                
-                if has_required_fields and result["status"] in test_case["expected_status"]:
-                    print_result(
-                        test_case["name"], 
-                        "PASS", 
-                        f"Status: {result['status']}, Confidence: {result['confidence_score']:.2f}, Time: {response_time:.2f}s"
-                    )
-                else:
-                    print_result(
-                        test_case["name"], 
-                        "PARTIAL", 
-                        f"Unexpected status: {result.get('status', 'Unknown')}"
-                    )
-            else:
-                print_result(
-                    test_case["name"], 
-                    "FAIL", 
-                    f"HTTP {response.status_code}: {response.text[:100]}"
-                )
-                
-        except requests.exceptions.RequestException as e:
-            print_result(test_case["name"], "FAIL", f"Request error: {e}")
+            response = await _send(client, method, url, **kwargs)
+        except httpx.TransportError:
+            if last_attempt:
+                raise
+        else:
+            if last_attempt or response.status_code not in RETRY_STATUSES:
+                return response
+        await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
 
-def test_negative_scenarios():
-    """Test negative scenarios and error handling"""
-    print_test_header("Negative Scenarios")
+def _json_body(payload: Dict[str, Any]) -> bytes:
+    """Serialize a request payload once so it can be sent (and cache-keyed) as-is"""
+    return json.dumps(payload).encode()
+
+async def _cached_post(client: httpx.AsyncClient, url: str, body: bytes, timeout: float) -> httpx.Response:
+    """POST a JSON body, replaying a cached 200 response for the same URL and body when enabled"""
+    if not RESPONSE_CACHE_ENABLED:
+        return await _request(client, "POST", url, content=body, timeout=timeout)
     
-    test_cases = [
-        {
-            "name": "Empty Query",
-            "query": "",
-            "expected_error": True
-        },
-        {
-            "name": "Whitespace Only Query",
-            "query": "   \n\t   ",
-            "expected_error": True
-        },
-        {
-            "name": "Extremely Long Query",
-            "query": "A" * 10000,
-            "expected_error": False  # Should handle gracefully
-        },
-        {
-            "name": "Special Characters",
-            "query": "'; DROP TABLE users; --",
-            "expected_error": False  # Should sanitize
-        },
-        {
-            "name": "HTML/Script Injection",
-            "query": "<script>alert('xss')</script>",
-            "expected_error": False  # Should sanitize
-        },
-        {
-            "name": "Template Injection",
-            "query": "{{7*7}}",
-            "expected_error": False  # Should handle safely
-        }
-    ]
+    key = hashlib.sha256(url.encode() + b"\0" + body).hexdigest()
+    path = RESPONSE_CACHE_DIR / f"{key}.json"
+    if path.exists():
+        cached = json.loads(path.read_text())
+        return httpx.Response(cached["status_code"], content=cached["content"].encode())
     
-    for test_case in test_cases:
-        try:
-            response = requests.post(
-                COMPLIANCE_ENDPOINT,
-                json={"concern": test_case["query"]},
-                headers={"Content-Type": "application/json"},
-                timeout=30
-            )
+    response = await _request(client, "POST", url, content=body, timeout=timeout)
+    # Only successes are cached, so a transient failure is retried on the next run
+    if response.status_code == 200:
+        RESPONSE_CACHE_DIR.mkdir(exist_ok=True)
+        path.write_text(json.dumps({"status_code": response.status_code, "content": response.text}))
+    return response
+
+# Test cases, shared by the concurrent script runner and the pytest tests below
+ComplianceCase = namedtuple("ComplianceCase", "name query body expected_status expected_error")
+MalformedCase = namedtuple("MalformedCase", "name data expected_status headers", defaults=(None,))
+
+def _compliance_case(name: str, query: str, expected_status: Tuple[str, ...] = (),
+                     expected_error: bool = False, body: bytes = None) -> ComplianceCase:
+    """Compliance case with its request body serialized once, up front"""
+    return ComplianceCase(name, query, body or _json_body({"concern": query}), frozenset(expected_status), expected_error)
+
+POSITIVE_CASES = (
+    _compliance_case(
+        "Compliant Query",
+        "We maintain customer data in encrypted databases with access controls and audit logs as required by data protection regulations.",
+        expected_status=("compliant", "partial_compliance")
+    ),
+    _compliance_case(
+        "Partial Compliance Query",
+        "We collect customer personal information and store it in our database, but we don't have a formal data retention policy.",
+        expected_status=("partial_compliance", "non_compliant", "requires_review")
+    ),
+    _compliance_case(
+        "Complex Regulatory Query",
+        "Our new mobile banking app collects biometric data, location information, and transaction history. We use third-party analytics providers and cloud storage. What are the compliance requirements?",
+        expected_status=("requires_review", "partial_compliance")
+    ),
+)
+
+NEGATIVE_CASES = (
+    _compliance_case("Empty Query", "", expected_error=True),
+    _compliance_case("Whitespace Only Query", "   \n\t   ", expected_error=True),
+    _compliance_case("Extremely Long Query", LONG_QUERY, body=LONG_QUERY_BODY),  # Should handle gracefully
+    _compliance_case("Special Characters", "'; DROP TABLE users; --"),  # Should sanitize
+    _compliance_case("HTML/Script Injection", "<script>alert('xss')</script>"),  # Should sanitize
+    _compliance_case("Template Injection", "{{7*7}}"),  # Should handle safely
+)
+
+MALFORMED_CASES = (
+    MalformedCase("Missing Concern Field", {"not_concern": "test"}, 422),
+    MalformedCase("Invalid JSON", "invalid json", 400),
+    MalformedCase("Wrong Content Type", {"concern": "test"}, 422, headers={"Content-Type": "text/plain"}),
+)
+
+async def run_positive_case(client: httpx.AsyncClient, limit: asyncio.Semaphore, test_case: ComplianceCase) -> Tuple[str, str, str]:
+    """Run one positive compliance case, returning (name, PASS/PARTIAL/FAIL, details)"""
+    try:
+        async with limit:
+            # Monotonic, nanosecond clock (time.time() can jump with NTP adjustments)
+            start_ns = time.perf_counter_ns()
+            response = await _cached_post(client, COMPLIANCE_ENDPOINT, test_case.body, timeout=30)
+            end_ns = time.perf_counter_ns()
+        
+        if response.status_code == 200:
+            result = response.json()
+            response_time = (end_ns - start_ns) / 1e9
             
-            if test_case["expected_error"]:
-                if response.status_code == 400:
-                    print_result(test_case["name"], "PASS", "Properly rejected invalid input")
-                else:
-                    print_result(test_case["name"], "FAIL", f"Should have rejected input but got HTTP {response.status_code}")
-            else:
-                if response.status_code == 200:
-                    result = response.json()
-                    print_result(test_case["name"], "PASS", f"Handled safely, Status: {result.get('status', 'Unknown')}")
-                else:
-                    print_result(test_case["name"], "FAIL", f"HTTP {response.status_code}: {response.text[:100]}")
-                    
-        except requests.exceptions.RequestException as e:
-            print_result(test_case["name"], "FAIL", f"Request error: {e}")
-
-def test_malformed_requests():
-    """Test malformed request handling"""
-    print_test_header("Malformed Request Tests")
-    
-    test_cases = [
-        {
-            "name": "Missing Concern Field",
-            "data": {"not_concern": "test"},
-            "expected_status": 422
-        },
-        {
-            "name": "Invalid JSON",
-            "data": "invalid json",
-            "expected_status": 400
-        },
-        {
-            "name": "Wrong Content Type",
-            "data": {"concern": "test"},
-            "headers": {"Content-Type": "text/plain"},
-            "expected_status": 422
-        }
-    ]
-    
-    for test_case in test_cases:
-        try:
-            headers = test_case.get("headers", {"Content-Type": "application/json"})
+            # Check if response has expected structure
+            has_required_fields = REQUIRED_COMPLIANCE_FIELDS.issubset(result)
             
-            if isinstance(test_case["data"], str):
-                response = requests.post(COMPLIANCE_ENDPOINT, data=test_case["data"], headers=headers, timeout=10)
-            else:
-                response = requests.post(COMPLIANCE_ENDPOINT, json=test_case["data"], headers=headers, timeout=10)
+            if has_required_fields and result["status"] in test_case.expected_status:
+                return (
+                    test_case.name, 
+                    "PASS", 
+                    f"Status: {result['status']}, Confidence: {result['confidence_score']:.2f}, Time: {response_time:.3f}s"
+                )
+            return (
+                test_case.name, 
+                "PARTIAL", 
+                f"Unexpected status: {result.get('status', 'Unknown')}"
+            )
+        return (
+            test_case.name, 
+            "FAIL", 
+            f"HTTP {response.status_code}: {response.text[:100]}"
+        )
             
-            if response.status_code == test_case["expected_status"]:
-                print_result(test_case["name"], "PASS", f"Correctly returned HTTP {response.status_code}")
+    except httpx.HTTPError as e:
+        return (test_case.name, "FAIL", f"Request error: {e}")
+    except ValueError as e:
+        # Body was not valid JSON (JSONDecodeError is a ValueError)
+        return (test_case.name, "FAIL", f"Invalid JSON response: {e}")
+
+async def run_negative_case(client: httpx.AsyncClient, limit: asyncio.Semaphore, test_case: ComplianceCase) -> Tuple[str, str, str]:
+    """Run one negative case, returning (name, PASS/FAIL, details)"""
+    try:
+        async with limit:
+            if test_case.expected_error:
+                # Rejections are what is under test, so always ask the backend, and fail fast
+                response = await _request(client, "POST", COMPLIANCE_ENDPOINT, retry=False, content=test_case.body, timeout=30)
             else:
-                print_result(test_case["name"], "FAIL", f"Expected HTTP {test_case['expected_status']}, got {response.status_code}")
+                response = await _cached_post(client, COMPLIANCE_ENDPOINT, test_case.body, timeout=30)
+        
+        if test_case.expected_error:
+            if response.status_code == 400:
+                return (test_case.name, "PASS", "Properly rejected invalid input")
+            return (test_case.name, "FAIL", f"Should have rejected input but got HTTP {response.status_code}")
+        if response.status_code == 200:
+            result = response.json()
+            return (test_case.name, "PASS", f"Handled safely, Status: {result.get('status', 'Unknown')}")
+        return (test_case.name, "FAIL", f"HTTP {response.status_code}: {response.text[:100]}")
                 
-        except requests.exceptions.RequestException as e:
-            print_result(test_case["name"], "FAIL", f"Request error: {e}")
+    except httpx.HTTPError as e:
+        return (test_case.name, "FAIL", f"Request error: {e}")
+    except ValueError as e:
+        # Body was not valid JSON (JSONDecodeError is a ValueError)
+        return (test_case.name, "FAIL", f"Invalid JSON response: {e}")
 
-def test_document_endpoints():
-    """Test document-related endpoints"""
-    print_test_header("Document Endpoints")
-    
-    # Test document status
+async def run_malformed_case(client: httpx.AsyncClient, limit: asyncio.Semaphore, test_case: MalformedCase) -> Tuple[str, str, str]:
+    """Run one malformed request case, returning (name, PASS/FAIL, details)"""
+    try:
+        # Per-case headers override the client's JSON Content-Type
+        headers = test_case.headers
+        
+        # Every case expects an error response, so none are retried
+        async with limit:
+            if isinstance(test_case.data, str):
+                response = await _request(client, "POST", COMPLIANCE_ENDPOINT, retry=False, content=test_case.data, headers=headers, timeout=10)
+            else:
+                response = await _request(client, "POST", COMPLIANCE_ENDPOINT, retry=False, json=test_case.data, headers=headers, timeout=10)
+        
+        if response.status_code == test_case.expected_status:
+            return (test_case.name, "PASS", f"Correctly returned HTTP {response.status_code}")
+        return (test_case.name, "FAIL", f"Expected HTTP {test_case.expected_status}, got {response.status_code}")
+            
+    except httpx.HTTPError as e:
+        return (test_case.name, "FAIL", f"Request error: {e}")
+
+async def check_document_status(client: httpx.AsyncClient, limit: asyncio.Semaphore) -> Tuple[str, str, str]:
+    """Check the document status endpoint"""
     try:
-        response = requests.get(DOCUMENTS_ENDPOINT, timeout=10)
+        async with limit:
+            response = await _request(client, "GET", DOCUMENTS_ENDPOINT, timeout=10)
         if response.status_code == 200:
             result = response.json()
-            if "total_documents" in result and "total_chunks" in result:
-                print_result(
+            if REQUIRED_STATUS_FIELDS.issubset(result):
+                return (
                     "Document Status", 
                     "PASS", 
                     f"Total documents: {result['total_documents']}, Total chunks: {result['total_chunks']}"
                 )
-            else:
-                print_result("Document Status", "FAIL", "Missing expected fields in response")
-        else:
-            print_result("Document Status", "FAIL", f"HTTP {response.status_code}")
-    except requests.exceptions.RequestException as e:
-        print_result("Document Status", "FAIL", f"Request error: {e}")
+            return ("Document Status", "FAIL", "Missing expected fields in response")
+        return ("Document Status", "FAIL", f"HTTP {response.status_code}")
+    except httpx.HTTPError as e:
+        return ("Document Status", "FAIL", f"Request error: {e}")
+    except ValueError as e:
+        # Body was not valid JSON (JSONDecodeError is a ValueError)
+        return ("Document Status", "FAIL", f"Invalid JSON response: {e}")
+
+async def check_document_reload(client: httpx.AsyncClient, limit: asyncio.Semaphore) -> Tuple[str, str, str]:
+    """Check the document reload endpoint (if available)"""
+    try:
+        async with limit:
+            response = await _request(client, "POST", RELOAD_ENDPOINT, timeout=30)
+        if response.status_code in {200, 202}:
+            return ("Document Reload", "PASS", "Reload endpoint accessible")
+        return ("Document Reload", "FAIL", f"HTTP {response.status_code}")
+    except httpx.HTTPError as e:
+        return ("Document Reload", "FAIL", f"Request error: {e}")
+
+async def run_document_checks(client: httpx.AsyncClient, limit: asyncio.Semaphore) -> List[Tuple[str, str, str]]:
+    """Check the status and reload endpoints concurrently (the slow reload no longer waits behind status)"""
+    return await asyncio.gather(
+        check_document_status(client, limit),
+        check_document_reload(client, limit)
+    )
+
+async def run_suite(title: str, case_results):
+    """Await a suite's concurrently running cases and print the suite in one block once all are done"""
+    results = await case_results
+    print_test_header(title)
+    for result in results:
+        print_result(*result)
+
+async def run_all_suites():
+    """
+    Run the compliance suites concurrently over one shared client, then the document checks
     
-    # Test document reload (if available)
+    The compliance suites share nothing, so their time is the slowest suite.
+    The document checks run last and alone: reload empties and rebuilds the
+    index, which would change the results of compliance queries in flight.
+    Each suite prints its header and results together once done, so output
+    from different suites never interleaves.
+    """
+    limit = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    async with _async_client() as client:
+        await asyncio.gather(
+            run_suite("Positive Scenarios", asyncio.gather(*(run_positive_case(client, limit, test_case) for test_case in POSITIVE_CASES))),
+            run_suite("Negative Scenarios", asyncio.gather(*(run_negative_case(client, limit, test_case) for test_case in NEGATIVE_CASES))),
+            run_suite("Malformed Request Tests", asyncio.gather(*(run_malformed_case(client, limit, test_case) for test_case in MALFORMED_CASES)))
+        )
+        await run_suite("Document Endpoints", run_document_checks(client, limit))
+
+# pytest entry points: `pytest -n auto test_api.py` (pytest-xdist) spreads the cases over worker processes;
+# the reload check then skips and runs in a separate serial step: `pytest -p no:xdist test_api.py -k reload`
+
+@pytest.fixture(scope="module")
+def api():
+    """Per-worker event loop, keep-alive client and request limit; skips when the backend is down"""
     try:
-        response = requests.post(RELOAD_ENDPOINT, timeout=30)
-        if response.status_code in [200, 202]:
-            print_result("Document Reload", "PASS", "Reload endpoint accessible")
-        else:
-            print_result("Document Reload", "FAIL", f"HTTP {response.status_code}")
-    except requests.exceptions.RequestException as e:
-        print_result("Document Reload", "FAIL", f"Request error: {e}")
+        SESSION.head(HEALTH_ENDPOINT, timeout=2)
+    except requests.exceptions.RequestException:
+        pytest.skip(f"Backend is not reachable at {BASE_URL}")
+    
+    loop = asyncio.new_event_loop()
+    client = _async_client()
+    limit = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    
+    def run(run_case, *args):
+        return loop.run_until_complete(run_case(client, limit, *args))
+    
+    yield run
+    loop.run_until_complete(client.aclose())
+    loop.close()
+
+def _check(result: Tuple[str, str, str]):
+    """Turn a (name, status, details) result into a pytest outcome"""
+    _, status, details = result
+    if status == "PARTIAL":
+        # The LLM answered, just with a status outside the expected set
+        pytest.xfail(details)
+    assert status == "PASS", details
+
+@pytest.mark.parametrize("test_case", POSITIVE_CASES, ids=lambda test_case: test_case.name)
+def test_positive(api, test_case):
+    """Test a positive compliance case returns an expected status."""
+    _check(api(run_positive_case, test_case))
+
+@pytest.mark.parametrize("test_case", NEGATIVE_CASES, ids=lambda test_case: test_case.name)
+def test_negative(api, test_case):
+    """Test invalid input is rejected and hostile input handled safely."""
+    _check(api(run_negative_case, test_case))
+
+@pytest.mark.parametrize("test_case", MALFORMED_CASES, ids=lambda test_case: test_case.name)
+def test_malformed(api, test_case):
+    """Test a malformed request gets the expected error status."""
+    _check(api(run_malformed_case, test_case))
+
+def test_document_status(api):
+    """Test the document status endpoint."""
+    _check(api(check_document_status))
+
+def test_document_reload(api):
+    """Test the document reload endpoint (defined last, so a serial run reaches it after the compliance cases)."""
+    if os.environ.get("PYTEST_XDIST_WORKER"):
+        # Reload empties and rebuilds the index under the compliance cases running on other workers
+        pytest.skip("Reload races the parallel compliance cases; run serially with -p no:xdist")
+    _check(api(check_document_reload))
 
 def main():
     """Main test runner"""
     print("🚀 RegReportRAG API Testing Suite")
     print("=" * 60)
     
-    # Check if API is accessible
-    if not test_api_connectivity():
-        print("\n❌ Cannot connect to API. Please ensure the backend is running on http://localhost:8000")
-        sys.exit(1)
-    
-    # Run all test suites
-    test_positive_scenarios()
-    test_negative_scenarios()
-    test_malformed_requests()
-    test_document_endpoints()
+    try:
+        # Check if API is accessible
+        if not check_api_connectivity():
+            emit("\n❌ Cannot connect to API. Please ensure the backend is running on http://localhost:8000")
+            sys.exit(1)
+        
+        warm_up_backend()
+        
+        # Run all test suites
+        asyncio.run(run_all_suites())
+    finally:
+        SESSION.close()
+        flush_output()
     
     print("\n" + "=" * 60)
     print("🏁 Testing Complete!")